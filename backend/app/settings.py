@@ -22,6 +22,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.metrics.QueryMetricsMiddleware",
+    "core.db_router.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -51,13 +53,44 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "app.wsgi.application"
 
+# DATABASE_POOL: "" keeps persistent connections per worker; "pgbouncer" for a
+# transaction-pooling PgBouncer in front of Postgres (no server-side cursors);
+# "psycopg" for Django's built-in pool (needs psycopg[pool] instead of psycopg2).
+DATABASE_POOL = os.getenv("DATABASE_POOL", "")
+
+def database(url):
+    config = dj_database_url.parse(url, conn_max_age=0 if DATABASE_POOL == "psycopg" else 600)
+    if DATABASE_POOL == "pgbouncer":
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+    elif DATABASE_POOL == "psycopg":
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DATABASE_POOL_MIN", "2")),
+            "max_size": int(os.getenv("DATABASE_POOL_MAX", "10")),
+        }
+    return config
+
 DATABASES = {
-    "default": dj_database_url.parse(
-        os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR/'db.sqlite3'}"),
-        conn_max_age=600,
-    )
+    "default": database(os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR/'db.sqlite3'}")),
 }
 
+# Comma-separated replica URLs; safe-method requests read from them (core.db_router)
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+for i, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    DATABASES[f"replica{i}"] = {**database(url), "TEST": {"MIRROR": "default"}}
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"] if DATABASE_REPLICA_URLS else []
+
+# Local caches only (no Redis). Set DJANGO_CACHE_DIR to share one file cache between
+# the gunicorn workers on a host, so invalidations reach every worker.
+if os.getenv("DJANGO_CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("DJANGO_CACHE_DIR"),
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 AUTH_USER_MODEL = "core.User"
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -89,8 +122,52 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    "DEFAULT_FILTER_BACKENDS": (
+        "core.filters.DeclaredFilterBackend",
+        "core.filters.KeysetOrderingFilter",
+        "core.filters.SparseFieldsFilter",
+    ),
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
 }
 
+# Teacher (term, section, subject) scopes used by TeacherCanModifyAssigned
+TEACHER_SCOPE_CACHE_TIMEOUT = int(os.getenv("TEACHER_SCOPE_CACHE_TIMEOUT", "300"))
+
+# Attendance analytics cache lifetime (seconds); writes invalidate it sooner
+ANALYTICS_CACHE_TIMEOUT = int(os.getenv("ANALYTICS_CACHE_TIMEOUT", "600"))
+
+# Reference data (schools, years, terms, grades, sections, subjects, fee heads) response cache
+REFERENCE_CACHE_TIMEOUT = int(os.getenv("REFERENCE_CACHE_TIMEOUT", "3600"))
+
+# Background jobs (core.jobs): retries back off JOB_RETRY_BASE_SECONDS * 2^(attempt-1);
+# a RUNNING job whose worker has been silent for JOB_LEASE_SECONDS is picked up again
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "900"))
+
+# Report card rendering processes (0 = one per CPU); smaller batches render in-process
+REPORT_CARD_WORKERS = int(os.getenv("REPORT_CARD_WORKERS", "0"))
+REPORT_CARD_POOL_MIN = int(os.getenv("REPORT_CARD_POOL_MIN", "50"))
+
+# Timetable grid for new timetables, and the solver's time budget in seconds (core.timetable)
+TIMETABLE_DAYS = int(os.getenv("TIMETABLE_DAYS", "5"))
+TIMETABLE_PERIODS_PER_DAY = int(os.getenv("TIMETABLE_PERIODS_PER_DAY", "8"))
+TIMETABLE_TIME_BUDGET = float(os.getenv("TIMETABLE_TIME_BUDGET", "10"))
+
+# Student search (core.search): pg_trgm word similarity needed for a fuzzy (typo) match
+STUDENT_SEARCH_SIMILARITY = float(os.getenv("STUDENT_SEARCH_SIMILARITY", "0.3"))
+# Without pg_trgm: max age of a process's in-memory prefix index (it misses other processes' edits)
+STUDENT_SEARCH_INDEX_TIMEOUT = int(os.getenv("STUDENT_SEARCH_INDEX_TIMEOUT", "60"))
+
+# Request/SQL metrics (core.metrics), scraped from /internal/metrics
+METRICS_ALLOWED_IPS = [
+    ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()
+]
+# Flag requests running more SQL statements than this (0 disables); viewsets may set `query_budget`.
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "30" if DEBUG else "0"))
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "0") == "1"
+
 # -----------------------
 # Production security
 # -----------------------
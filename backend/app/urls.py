@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from core import views
+from core import portal, views
+from core.metrics import metrics_view
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = DefaultRouter()
@@ -17,12 +18,18 @@ router.register(r"sections", views.SectionViewSet)
 router.register(r"subjects", views.SubjectViewSet)
 router.register(r"enrollments", views.EnrollmentViewSet)
 router.register(r"teacher-assignments", views.TeacherAssignmentViewSet)
+router.register(r"unavailability", views.UnavailabilityViewSet)
+router.register(r"timetables", views.TimetableViewSet)
+router.register(r"timetable-entries", views.TimetableEntryViewSet)
 
 router.register(r"attendance-sessions", views.AttendanceSessionViewSet)
 router.register(r"attendance-records", views.AttendanceRecordViewSet)
+router.register(r"attendance-analytics", views.AttendanceAnalyticsViewSet, basename="attendance-analytics")
 
 router.register(r"assessments", views.AssessmentViewSet)
 router.register(r"assessment-scores", views.AssessmentScoreViewSet)
+router.register(r"term-results", views.TermResultViewSet)
+router.register(r"report-cards", views.ReportCardViewSet, basename="report-cards")
 
 router.register(r"fee-heads", views.FeeHeadViewSet)
 router.register(r"fee-structures", views.FeeStructureViewSet)
@@ -32,9 +39,14 @@ router.register(r"invoice-items", views.InvoiceItemViewSet)
 router.register(r"payments", views.PaymentViewSet)
 router.register(r"payment-allocations", views.PaymentAllocationViewSet)
 
+router.register(r"jobs", views.JobViewSet)
+router.register(r"sync", views.SyncViewSet, basename="sync")
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/portal/dashboard/", portal.student_dashboard, name="portal-dashboard"),
     path("api/", include(router.urls)),
+    path("internal/metrics", metrics_view, name="metrics"),
 ]
@@ -5,9 +5,11 @@ for m in [
     models.School, models.User, models.Student, models.Teacher,
     models.AcademicYear, models.Term, models.Grade, models.Section, models.Subject,
     models.Enrollment, models.TeacherAssignment,
+    models.Unavailability, models.Timetable, models.TimetableEntry,
     models.AttendanceSession, models.AttendanceRecord,
-    models.Assessment, models.AssessmentScore,
+    models.Assessment, models.AssessmentScore, models.TermResult,
     models.FeeHead, models.FeeStructure, models.FeeStructureItem,
-    models.Invoice, models.InvoiceItem, models.Payment, models.PaymentAllocation
+    models.Invoice, models.InvoiceItem, models.Payment, models.PaymentAllocation,
+    models.SyncChange, models.Job,
 ]:
     admin.site.register(m)
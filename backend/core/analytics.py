@@ -0,0 +1,110 @@
+"""Attendance analytics computed with conditional aggregation and cached per (term, section).
+
+Cached results are keyed by a per-(term, section) version number that
+core.signals bumps whenever a record or session in that scope changes, so a
+write makes the next read recompute instead of waiting for the timeout.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast
+
+from .db_router import pin_primary
+from .models import AttendanceRecord, AttendanceSession
+
+PRESENT, ABSENT, LATE = AttendanceRecord.Status.PRESENT, AttendanceRecord.Status.ABSENT, AttendanceRecord.Status.LATE
+
+def _version_key(term_id, section_id):
+    return f"attendance-analytics:v:{term_id}:{section_id or 'all'}"
+
+def _version(term_id, section_id):
+    return cache.get_or_set(_version_key(term_id, section_id), 1, None)
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+def invalidate(term_id, section_id):
+    """Drop cached analytics for a section and for its whole term."""
+    _bump(_version_key(term_id, section_id))
+    _bump(_version_key(term_id, None))
+
+def session_scope(session_id):
+    """(term_id, section_id) of a session, cached so record signals don't hit the database."""
+    key = f"attendance-session-scope:{session_id}"
+    scope = cache.get(key)
+    if scope is None:
+        scope = AttendanceSession.objects.filter(pk=session_id).values_list("term_id", "section_id").first()
+        if scope:
+            cache.set(key, scope, None)
+    return scope
+
+def forget_session(session_id):
+    cache.delete(f"attendance-session-scope:{session_id}")
+
+def _cached(kind, term_id, section_id, compute, *extra):
+    key = ":".join(str(p) for p in ("attendance-analytics", kind, term_id, section_id or "all", _version(term_id, section_id), *extra))
+    result = cache.get(key)
+    if result is None:
+        pin_primary()  # don't cache a lagging replica's view under the new version
+        result = compute()
+        cache.set(key, result, getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 600))
+    return result
+
+def _records(term_id, section_id):
+    qs = AttendanceRecord.objects.filter(session__term_id=term_id)
+    if section_id:
+        qs = qs.filter(session__section_id=section_id)
+    return qs
+
+def _counts():
+    return {
+        "recorded": Count("id"),
+        "present": Count("id", filter=Q(status=PRESENT)),
+        "absent": Count("id", filter=Q(status=ABSENT)),
+        "late": Count("id", filter=Q(status=LATE)),
+    }
+
+def _pct(expr):
+    return Cast(expr, FloatField()) * 100 / Cast(F("recorded"), FloatField())
+
+def _student_rates_qs(term_id, section_id):
+    return (
+        _records(term_id, section_id)
+        .values("student_id", "student__admission_no", "student__first_name", "student__last_name")
+        .annotate(**_counts())
+        .annotate(attendance_rate=_pct(F("present") + F("late")), absence_rate=_pct(F("absent")))
+    )
+
+def _rows(qs):
+    rows = []
+    for row in qs:
+        for key in ("attendance_rate", "absence_rate", "present_rate", "late_rate"):
+            if key in row:
+                row[key] = round(row[key], 2)
+        rows.append(row)
+    return rows
+
+def student_rates(term_id, section_id=None):
+    """Per-student attendance percentage (PRESENT and LATE count as attended)."""
+    return _cached("students", term_id, section_id, lambda: _rows(
+        _student_rates_qs(term_id, section_id).order_by("student__last_name", "student__first_name", "student_id")
+    ))
+
+def daily_rates(term_id, section_id=None):
+    """PRESENT / ABSENT / LATE counts and rates per section per school day."""
+    return _cached("daily", term_id, section_id, lambda: _rows(
+        _records(term_id, section_id)
+        .values("session__session_date", "session__section_id")
+        .annotate(**_counts())
+        .annotate(present_rate=_pct(F("present")), absence_rate=_pct(F("absent")), late_rate=_pct(F("late")))
+        .order_by("session__session_date", "session__section_id")
+    ))
+
+def chronic_absentees(term_id, section_id=None, threshold=10.0):
+    """Students absent for at least `threshold` percent of recorded sessions, worst first."""
+    return _cached("chronic", term_id, section_id, lambda: _rows(
+        _student_rates_qs(term_id, section_id).filter(absence_rate__gte=threshold).order_by("-absence_rate", "student_id")
+    ), threshold)
@@ -0,0 +1,185 @@
+"""Fee billing: invoicing fee structures, allocating payments and keeping invoice totals current."""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import GreaterThan, GreaterThanOrEqual
+from django.utils import timezone
+
+from .models import Enrollment, Invoice, InvoiceItem, Payment, PaymentAllocation
+
+def generate_invoices(fee_structure, issued_on=None, due_on=None, chunk_size=1000, progress=None):
+    """Invoice every ACTIVE enrollment in the structure's grade and academic year.
+
+    Idempotent: students who already have an invoice for this structure are
+    skipped. Work is committed one chunk at a time; `progress(done, total)` is
+    called after each chunk.
+    """
+    issued_on = issued_on or timezone.localdate()
+    lines = list(fee_structure.items.values_list("fee_head_id", "amount"))
+    invoice_total = sum((amount for _, amount in lines), Decimal("0"))
+    school_id = fee_structure.grade.school_id
+    student_ids = list(
+        Enrollment.objects.filter(
+            academic_year_id=fee_structure.academic_year_id,
+            section__grade_id=fee_structure.grade_id,
+            status=Enrollment.Status.ACTIVE,
+        ).order_by("student_id").values_list("student_id", flat=True)
+    )
+    total = len(student_ids)
+    created = skipped = 0
+
+    for start in range(0, total, chunk_size):
+        chunk = student_ids[start:start + chunk_size]
+        with transaction.atomic():
+            existing = set(
+                Invoice.objects.filter(fee_structure=fee_structure, student_id__in=chunk).values_list("student_id", flat=True)
+            )
+            invoices = [
+                Invoice(
+                    school_id=school_id,
+                    student_id=student_id,
+                    academic_year_id=fee_structure.academic_year_id,
+                    fee_structure=fee_structure,
+                    issued_on=issued_on,
+                    due_on=due_on,
+                    total=invoice_total,
+                    balance=invoice_total,
+                )
+                for student_id in chunk
+                if student_id not in existing
+            ]
+            Invoice.objects.bulk_create(invoices)
+            if invoices and invoices[0].pk is None:
+                # Backends that cannot return ids from a bulk insert.
+                ids = dict(
+                    Invoice.objects.filter(fee_structure=fee_structure, student_id__in=[i.student_id for i in invoices])
+                    .values_list("student_id", "id")
+                )
+                for invoice in invoices:
+                    invoice.pk = ids[invoice.student_id]
+            InvoiceItem.objects.bulk_create([
+                InvoiceItem(invoice_id=invoice.pk, fee_head_id=fee_head_id, amount=amount)
+                for invoice in invoices
+                for fee_head_id, amount in lines
+            ])
+        created += len(invoices)
+        skipped += len(existing)
+        if progress:
+            progress(min(start + chunk_size, total), total)
+
+    return {"students": total, "invoices_created": created, "already_invoiced": skipped}
+
+def _status(total, paid):
+    """Invoice status as a SQL expression over `total` and `paid` expressions."""
+    return Case(
+        When(GreaterThan(total, 0) & GreaterThanOrEqual(paid, total), then=Value(Invoice.Status.PAID)),
+        When(GreaterThan(paid, 0), then=Value(Invoice.Status.PARTIAL)),
+        default=Value(Invoice.Status.UNPAID),
+    )
+
+def _status_for(total, paid):
+    """Python twin of _status() for invoices updated in memory."""
+    if total > 0 and paid >= total:
+        return Invoice.Status.PAID
+    if paid > 0:
+        return Invoice.Status.PARTIAL
+    return Invoice.Status.UNPAID
+
+def apply_invoice_delta(invoice_id, total=0, paid=0):
+    """Shift an invoice's denormalized totals in a single UPDATE and recompute its status."""
+    new_total = F("total") + Decimal(total)
+    new_paid = F("paid") + Decimal(paid)
+    Invoice.objects.filter(pk=invoice_id).update(
+        total=new_total,
+        paid=new_paid,
+        balance=new_total - new_paid,
+        status=_status(new_total, new_paid),
+    )
+
+def _summed(model):
+    sub = model.objects.filter(invoice=OuterRef("pk")).values("invoice").annotate(s=Sum("amount")).values("s")
+    return Coalesce(Subquery(sub), Value(Decimal("0")), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+def reconcile_invoices(fix=True):
+    """Compare denormalized invoice columns with items/allocations; rebuild drifted rows set-wise.
+
+    Returns the ids of invoices that had drifted.
+    """
+    expected = Invoice.objects.annotate(
+        exp_total=_summed(InvoiceItem),
+        exp_paid=_summed(PaymentAllocation),
+    ).annotate(
+        exp_balance=F("exp_total") - F("exp_paid"),
+        exp_status=_status(F("exp_total"), F("exp_paid")),
+    )
+    drifted = list(
+        expected.exclude(
+            total=F("exp_total"), paid=F("exp_paid"), balance=F("exp_balance"), status=F("exp_status"),
+        ).values_list("pk", flat=True)
+    )
+    if fix and drifted:
+        with transaction.atomic():
+            Invoice.objects.filter(pk__in=drifted).update(total=_summed(InvoiceItem), paid=_summed(PaymentAllocation))
+            Invoice.objects.filter(pk__in=drifted).update(
+                balance=F("total") - F("paid"), status=_status(F("total"), F("paid")),
+            )
+    return drifted
+
+def allocate_payments(payment_ids):
+    """Spread payments FIFO over each student's open invoices, oldest `due_on` first.
+
+    Runs in one transaction. Only the payments and their students' open
+    invoices are row-locked (in id order, so concurrent runs cannot deadlock).
+    Amounts already allocated are respected, so re-running is safe.
+    """
+    summary = {"payments": 0, "allocations": 0, "allocated": Decimal("0"), "unallocated": Decimal("0")}
+    with transaction.atomic():
+        payments = list(Payment.objects.select_for_update().filter(pk__in=payment_ids).order_by("id"))
+        if not payments:
+            return summary
+        allocated = dict(
+            PaymentAllocation.objects.filter(payment__in=payments)
+            .values("payment_id").annotate(s=Sum("amount")).values_list("payment_id", "s")
+        )
+        existing = set(PaymentAllocation.objects.filter(payment__in=payments).values_list("payment_id", "invoice_id"))
+
+        open_invoices = {}
+        for invoice in (
+            Invoice.objects.select_for_update()
+            .filter(student_id__in={p.student_id for p in payments}, balance__gt=0)
+            .order_by("id")
+        ):
+            open_invoices.setdefault(invoice.student_id, []).append(invoice)
+        for invoices in open_invoices.values():
+            invoices.sort(key=lambda i: (i.due_on is None, i.due_on, i.issued_on, i.id))
+
+        new_allocations, top_ups, touched = [], [], {}
+        for payment in sorted(payments, key=lambda p: (p.paid_on, p.id)):
+            remaining = Decimal(payment.amount) - (allocated.get(payment.id) or 0)
+            summary["payments"] += 1
+            for invoice in open_invoices.get(payment.student_id, ()):
+                if remaining <= 0:
+                    break
+                if invoice.balance <= 0:
+                    continue
+                take = min(remaining, invoice.balance)
+                if (payment.id, invoice.id) in existing:
+                    top_ups.append((payment.id, invoice.id, take))
+                else:
+                    new_allocations.append(PaymentAllocation(payment_id=payment.id, invoice_id=invoice.id, amount=take))
+                invoice.paid += take
+                invoice.balance -= take
+                invoice.status = _status_for(invoice.total, invoice.paid)
+                touched[invoice.id] = invoice
+                remaining -= take
+                summary["allocations"] += 1
+                summary["allocated"] += take
+            summary["unallocated"] += max(remaining, Decimal("0"))
+
+        PaymentAllocation.objects.bulk_create(new_allocations, batch_size=1000)
+        for payment_id, invoice_id, take in top_ups:
+            PaymentAllocation.objects.filter(payment_id=payment_id, invoice_id=invoice_id).update(amount=F("amount") + take)
+        Invoice.objects.bulk_update(touched.values(), ["paid", "balance", "status"], batch_size=1000)
+    return summary
@@ -0,0 +1,60 @@
+"""Response cache for rarely-changing reference data (schools, years, terms, grades, ...).
+
+Entries are keyed per school and per URL, and carry an ETag so clients can
+revalidate with If-None-Match and get 304 Not Modified. Any save/delete of a
+reference model bumps one generation number (see core.signals); that
+invalidates every entry at once, including responses that embed other
+reference rows.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .db_router import pin_primary
+
+GENERATION_KEY = "refcache:generation"
+
+def generation():
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+def invalidate_reference_data():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+class ReferenceCacheMixin:
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(request, super().retrieve, *args, **kwargs)
+
+    def _cache_key(self, request):
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        school = request.user.school_id or "all"
+        return f"refcache:{generation()}:{self.basename}:{school}:{url}"
+
+    def _cached_response(self, request, handler, *args, **kwargs):
+        key = self._cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            # Fill from the primary: a lagging replica could cache pre-invalidation rows.
+            pin_primary()
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            body = json.dumps(response.data, cls=DjangoJSONEncoder, sort_keys=True)
+            entry = (response.data, f'"{hashlib.md5(body.encode()).hexdigest()}"')
+            cache.set(key, entry, getattr(settings, "REFERENCE_CACHE_TIMEOUT", 3600))
+        data, etag = entry
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(data, headers=headers)
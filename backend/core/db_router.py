@@ -0,0 +1,73 @@
+"""Read-replica routing.
+
+ReplicaRoutingMiddleware marks each request: safe methods (GET/HEAD/OPTIONS)
+may read from a replica, anything else stays on the primary. Once a request
+writes, or opens a transaction on the primary, its remaining reads go to the
+primary too so it always sees its own writes. Code outside a request
+(management commands, the job worker) always uses the primary. The middleware
+runs natively under ASGI; the alias lives in a ContextVar, which sync_to_async
+carries into (and back out of) the ORM's thread.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Replica alias the current request may read from; None means "use the primary".
+_read_alias = ContextVar("read_alias", default=None)
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+def pin_primary():
+    """Send the rest of this request's reads to the primary."""
+    _read_alias.set(None)
+
+class ReplicaRoutingMiddleware:
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.replicas = replica_aliases()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _alias(self, request):
+        return random.choice(self.replicas) if self.replicas and request.method in SAFE_METHODS else None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _read_alias.set(self._alias(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+    async def __acall__(self, request):
+        token = _read_alias.set(self._alias(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
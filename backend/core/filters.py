@@ -0,0 +1,96 @@
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import models
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+BOOLEANS = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+
+def _is_boolean(model, lookup):
+    if lookup.endswith("__isnull"):
+        return True
+    try:
+        return isinstance(model._meta.get_field(lookup), models.BooleanField)
+    except FieldDoesNotExist:
+        return False
+
+class DeclaredFilterBackend(BaseFilterBackend):
+    """Filters from `filter_params = {"query_param": "orm__lookup"}` on the viewset.
+
+    Lookups ending in `__in` take comma-separated values; boolean fields and
+    `__isnull` lookups take true/false. Each declared filter
+    is backed by an index (see the Meta.indexes on the model).
+    """
+    def filter_queryset(self, request, queryset, view):
+        for param, lookup in getattr(view, "filter_params", {}).items():
+            value = request.query_params.get(param)
+            if value in (None, ""):
+                continue
+            if lookup.endswith("__in"):
+                value = [v for v in value.split(",") if v]
+            elif _is_boolean(queryset.model, lookup):
+                if value.lower() not in BOOLEANS:
+                    raise ValidationError({param: "Expected true or false."})
+                value = BOOLEANS[value.lower()]
+            try:
+                queryset = queryset.filter(**{lookup: value})
+            except (ValueError, TypeError, DjangoValidationError):
+                raise ValidationError({param: f"Invalid value '{request.query_params[param]}'."})
+        return queryset
+
+class KeysetOrderingFilter(OrderingFilter):
+    """`?ordering=` limited to the viewset's `ordering_fields` (non-null columns only,
+    as cursor pagination requires); otherwise the paginator's own ordering.
+
+    One column is used, with `id` in the same direction as a tie-breaker, so the
+    keyset (column, id) is unique; the composite indexes on the models end in id.
+    """
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        field = ordering[0]
+        if field.lstrip("-") in ("id", "pk"):
+            return (field,)
+        return (field, "-id" if field.startswith("-") else "id")
+
+    def get_valid_fields(self, queryset, view, context={}):
+        if getattr(view, "ordering_fields", None) is None:
+            return []
+        return super().get_valid_fields(queryset, view, context)
+
+    def get_default_ordering(self, view):
+        ordering = super().get_default_ordering(view)
+        if ordering:
+            return ordering
+        ordering = getattr(getattr(view, "pagination_class", None), "ordering", None) or "-id"
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+
+class SparseFieldsFilter(BaseFilterBackend):
+    """Shapes list/retrieve querysets to `?fields=` / `?expand=` (see DynamicFieldsModelSerializer).
+
+    Expanded forward relations are joined with select_related and reverse
+    ones prefetched, so an expanded page costs a constant number of queries;
+    `?fields=` also prunes the selected columns.
+    """
+    def filter_queryset(self, request, queryset, view):
+        if request.method != "GET" or getattr(view, "action", None) not in {"list", "retrieve"}:
+            return queryset
+        from .serializers import DynamicFieldsModelSerializer, requested
+
+        serializer_class = view.get_serializer_class()
+        if not issubclass(serializer_class, DynamicFieldsModelSerializer):
+            return queryset
+        keep = requested(request, "fields")
+        opts = queryset.model._meta
+        for name in requested(request, "expand") & set(serializer_class.expandable_fields):
+            if keep and name not in keep:
+                continue
+            field = opts.get_field(name)
+            if field.many_to_one or (field.one_to_one and field.concrete):
+                queryset = queryset.select_related(name)
+            else:
+                queryset = queryset.prefetch_related(name)
+        if keep:
+            concrete = {f.name for f in opts.concrete_fields}
+            queryset = queryset.only(opts.pk.name, *(keep & concrete))
+        return queryset
@@ -0,0 +1,102 @@
+"""Weighted gradebook: term marks, class ranks and percentiles.
+
+A student's subject mark is sum(score / max_score * weight) / sum(weight) over
+the graded assessments of a (term, section, subject), as a percentage. The
+overall mark is the mean of the subject marks. Marks are computed with one
+aggregate query and materialized into TermResult so reports never rescan
+AssessmentScore.
+"""
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, F, FloatField, Sum
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import AssessmentScore, TermResult
+
+TWO_PLACES = Decimal("0.01")
+
+def _weighted_marks(**filters):
+    """One grouped query: {(section_id, subject_id, student_id): percentage}."""
+    weight = Cast(F("assessment__weight"), FloatField())
+    rows = (
+        AssessmentScore.objects
+        .filter(score__isnull=False, assessment__max_score__gt=0, **filters)
+        .values("assessment__section_id", "assessment__subject_id", "student_id")
+        .annotate(
+            earned=Sum(Cast(F("score"), FloatField()) * weight / Cast(F("assessment__max_score"), FloatField())),
+            weight_total=Sum(weight),
+        )
+    )
+    return {
+        (r["assessment__section_id"], r["assessment__subject_id"], r["student_id"]): r["earned"] / r["weight_total"] * 100
+        for r in rows
+        if r["weight_total"]
+    }
+
+def _ranked(term_id, section_id, subject_id, marks, now):
+    """TermResult rows for one class, with competition ranks ("1224") and percentile ranks."""
+    ordered = sorted(marks.items(), key=lambda kv: kv[1], reverse=True)
+    n = len(ordered)
+    ties = Counter(marks.values())
+    results = []
+    for i, (student_id, pct) in enumerate(ordered):
+        rank = i + 1 if i == 0 or pct < ordered[i - 1][1] else results[-1].rank
+        equal = ties[pct]
+        below = n - rank + 1 - equal
+        results.append(TermResult(
+            term_id=term_id,
+            section_id=section_id,
+            subject_id=subject_id,
+            student_id=student_id,
+            percentage=Decimal(pct).quantize(TWO_PLACES),
+            rank=rank,
+            percentile=Decimal((below + 0.5 * equal) / n * 100).quantize(TWO_PLACES),
+            computed_at=now,
+        ))
+    return results
+
+def _overall_rows(term_id, section_id, now):
+    marks = {
+        r["student_id"]: float(r["pct"])
+        for r in TermResult.objects.filter(term_id=term_id, section_id=section_id, subject__isnull=False)
+        .values("student_id").annotate(pct=Avg("percentage"))
+    }
+    return _ranked(term_id, section_id, None, marks, now)
+
+@transaction.atomic
+def refresh_results(term_id, section_id, subject_id):
+    """Incrementally refresh one subject of one class, then that class's overall marks."""
+    now = timezone.now()
+    marks = _weighted_marks(
+        assessment__term_id=term_id, assessment__section_id=section_id, assessment__subject_id=subject_id,
+    )
+    TermResult.objects.filter(term_id=term_id, section_id=section_id, subject_id=subject_id).delete()
+    TermResult.objects.bulk_create(
+        _ranked(term_id, section_id, subject_id, {student: pct for (_, _, student), pct in marks.items()}, now)
+    )
+    TermResult.objects.filter(term_id=term_id, section_id=section_id, subject__isnull=True).delete()
+    TermResult.objects.bulk_create(_overall_rows(term_id, section_id, now))
+
+@transaction.atomic
+def rebuild_term(term_id):
+    """Recompute every class in a term from a single aggregate pass. Returns rows written."""
+    now = timezone.now()
+    by_class = defaultdict(dict)
+    for (section_id, subject_id, student_id), pct in _weighted_marks(assessment__term_id=term_id).items():
+        by_class[(section_id, subject_id)][student_id] = pct
+
+    TermResult.objects.filter(term_id=term_id).delete()
+    rows = []
+    overall = defaultdict(lambda: defaultdict(list))
+    for (section_id, subject_id), marks in by_class.items():
+        for result in _ranked(term_id, section_id, subject_id, marks, now):
+            rows.append(result)
+            overall[section_id][result.student_id].append(float(result.percentage))
+    for section_id, per_student in overall.items():
+        marks = {student_id: sum(p) / len(p) for student_id, p in per_student.items()}
+        rows.extend(_ranked(term_id, section_id, None, marks, now))
+    TermResult.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
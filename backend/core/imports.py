@@ -0,0 +1,194 @@
+"""Bulk student / user / enrollment import from CSV rows.
+
+Columns: admission_no, first_name, last_name (required); dob (YYYY-MM-DD),
+gender, email (creates a STUDENT login), academic_year, grade, section,
+enrolled_on. academic_year, grade and section go together and create an
+ACTIVE enrollment.
+"""
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import search, sync
+from .models import AcademicYear, Enrollment, Section, Student, User
+
+REQUIRED = ("admission_no", "first_name", "last_name")
+
+def _clean(row):
+    return {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+
+def _parse_date(value, field, errors):
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        errors[field] = "Expected a date in YYYY-MM-DD format."
+    return parsed
+
+class StudentImporter:
+    def __init__(self, school, chunk_size=500, progress=None):
+        self.school = school
+        self.chunk_size = chunk_size
+        self.progress = progress
+        # One lookup each, reused for every row.
+        self.sections = {
+            (grade, name): pk
+            for pk, grade, name in Section.objects.filter(grade__school=school).values_list("id", "grade__name", "name")
+        }
+        self.years = dict(AcademicYear.objects.filter(school=school).values_list("name", "id"))
+        self.seen_admission_nos = set()
+        self.seen_emails = set()
+        self.report = {"rows": 0, "created": 0, "enrolled": 0, "errors": []}
+
+    def run(self, rows):
+        numbered = enumerate(rows, start=2)  # line 1 is the CSV header
+        while True:
+            chunk = list(islice(numbered, self.chunk_size))
+            if not chunk:
+                self.report["errors"].sort(key=lambda e: e["row"])
+                return self.report
+            self.report["rows"] += len(chunk)
+            self._import_chunk(chunk)
+            if self.progress:
+                self.progress(self.report["rows"])
+
+    def _validate(self, row):
+        errors = {}
+        for field in REQUIRED:
+            if not row.get(field):
+                errors[field] = "This field is required."
+        data = {
+            "admission_no": row.get("admission_no", ""),
+            "first_name": row.get("first_name", ""),
+            "last_name": row.get("last_name", ""),
+            "gender": row.get("gender") or None,
+            "dob": _parse_date(row.get("dob"), "dob", errors),
+            "enrolled_on": _parse_date(row.get("enrolled_on"), "enrolled_on", errors),
+            "email": User.objects.normalize_email(row.get("email", "")) or None,
+            "section_id": None,
+            "academic_year_id": None,
+        }
+        if data["email"]:
+            try:
+                validate_email(data["email"])
+            except ValidationError:
+                errors["email"] = "Enter a valid email address."
+        placement = [row.get("academic_year"), row.get("grade"), row.get("section")]
+        if any(placement):
+            if not all(placement):
+                errors["section"] = "academic_year, grade and section must be given together."
+            else:
+                data["academic_year_id"] = self.years.get(placement[0])
+                data["section_id"] = self.sections.get((placement[1], placement[2]))
+                if data["academic_year_id"] is None:
+                    errors["academic_year"] = f"Unknown academic year '{placement[0]}'."
+                if data["section_id"] is None:
+                    errors["section"] = f"Unknown section '{placement[1]} {placement[2]}'."
+        if data["admission_no"] in self.seen_admission_nos:
+            errors["admission_no"] = "Duplicate admission_no in file."
+        if data["email"] and data["email"].lower() in self.seen_emails:
+            errors["email"] = "Duplicate email in file."
+        self.seen_admission_nos.add(data["admission_no"])
+        if data["email"]:
+            self.seen_emails.add(data["email"].lower())
+        return data, errors
+
+    def _import_chunk(self, chunk):
+        candidates = []
+        for line, raw in chunk:
+            data, errors = self._validate(_clean(raw))
+            if errors:
+                self.report["errors"].append({"row": line, "errors": errors})
+            else:
+                candidates.append((line, data))
+
+        # Uniqueness against the database: one query per chunk, not per row.
+        taken_nos = set(Student.objects.filter(
+            school=self.school, admission_no__in=[d["admission_no"] for _, d in candidates]
+        ).values_list("admission_no", flat=True))
+        taken_emails = {e.lower() for e in User.objects.filter(
+            email__in=[d["email"] for _, d in candidates if d["email"]]
+        ).values_list("email", flat=True)}
+        valid = []
+        for line, data in candidates:
+            if data["admission_no"] in taken_nos:
+                self.report["errors"].append({"row": line, "errors": {"admission_no": "Already exists in this school."}})
+            elif data["email"] and data["email"].lower() in taken_emails:
+                self.report["errors"].append({"row": line, "errors": {"email": "A user with this email already exists."}})
+            else:
+                valid.append((line, data))
+        if not valid:
+            return
+
+        try:
+            with transaction.atomic():
+                self._insert([data for _, data in valid])
+        except IntegrityError as exc:
+            for line, _ in valid:
+                self.report["errors"].append({"row": line, "errors": {"non_field_errors": f"Not imported: {exc}"}})
+            return
+        self.report["created"] += len(valid)
+        self.report["enrolled"] += sum(1 for _, d in valid if d["section_id"])
+
+    def _insert(self, rows):
+        users = {}
+        for data in rows:
+            if data["email"]:
+                user = User(email=data["email"], role=User.Role.STUDENT, school=self.school)
+                user.set_unusable_password()
+                users[data["admission_no"]] = user
+        User.objects.bulk_create(users.values())
+        if users and next(iter(users.values())).pk is None:
+            ids = dict(User.objects.filter(email__in=[u.email for u in users.values()]).values_list("email", "id"))
+            for user in users.values():
+                user.pk = ids[user.email]
+
+        students = [
+            Student(
+                school=self.school,
+                user_id=users[data["admission_no"]].pk if data["admission_no"] in users else None,
+                admission_no=data["admission_no"],
+                first_name=data["first_name"],
+                last_name=data["last_name"],
+                dob=data["dob"],
+                gender=data["gender"],
+            )
+            for data in rows
+        ]
+        Student.objects.bulk_create(students)
+        if students[0].pk is None:
+            ids = dict(Student.objects.filter(
+                school=self.school, admission_no__in=[s.admission_no for s in students]
+            ).values_list("admission_no", "id"))
+            for student in students:
+                student.pk = ids[student.admission_no]
+        search.invalidate(self.school.pk)
+
+        today = timezone.localdate()
+        enrollments = Enrollment.objects.bulk_create([
+            Enrollment(
+                school_id=self.school.pk,
+                student_id=student.pk,
+                academic_year_id=data["academic_year_id"],
+                section_id=data["section_id"],
+                enrolled_on=data["enrolled_on"] or today,
+            )
+            for student, data in zip(students, rows)
+            if data["section_id"]
+        ])
+        if enrollments:
+            sync.record_changes(Enrollment.objects.filter(student_id__in=[e.student_id for e in enrollments]))
+
+def import_students(school, rows, chunk_size=500, progress=None):
+    """Import CSV dict rows for `school`; returns a report with per-row errors.
+
+    `progress(rows_read)` is called after each chunk.
+    """
+    return StudentImporter(school, chunk_size=chunk_size, progress=progress).run(rows)
@@ -0,0 +1,176 @@
+"""Database-backed job queue: no broker, just the `Job` table and `manage.py run_worker`.
+
+Tasks are plain functions registered with @task(name); they receive the job's
+JSON payload as keyword arguments plus a `progress(done, total=None)`
+callback, and return a JSON-serializable result. Workers claim jobs with
+SELECT ... FOR UPDATE SKIP LOCKED where the database supports it (PostgreSQL)
+and with a conditional UPDATE elsewhere (SQLite), so several workers never
+run the same job. Failed jobs are retried with exponential backoff; a job
+whose worker died is reclaimed once its lease expires. While a job runs, a
+heartbeat thread (on its own connection, so a task's long transaction does not
+hide it) keeps renewing the lease, and every state change is conditional on
+the worker still holding it.
+"""
+import csv
+import io
+import threading
+import traceback
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import billing, gradebook, imports, rollover, timetable
+from .models import AcademicYear, FeeStructure, Job, School, Term, Timetable
+
+TASKS = {}
+
+def task(name):
+    def register(fn):
+        TASKS[name] = fn
+        return fn
+    return register
+
+def enqueue(name, payload=None, user=None, max_attempts=None):
+    if name not in TASKS:
+        raise KeyError(f"Unknown job {name!r}")
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts or getattr(settings, "JOB_MAX_ATTEMPTS", 3),
+    )
+
+def _claimable(now):
+    lease = timedelta(seconds=getattr(settings, "JOB_LEASE_SECONDS", 900))
+    return (
+        Job.objects
+        .filter(Q(status=Job.Status.QUEUED, run_after__lte=now) | Q(status=Job.Status.RUNNING, locked_at__lt=now - lease))
+        .order_by("run_after", "id")
+    )
+
+def claim(worker_id):
+    """Mark the next due job RUNNING for `worker_id` and return it, or None."""
+    now = timezone.now()
+    claimed = {"status": Job.Status.RUNNING, "locked_by": worker_id, "locked_at": now}
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _claimable(now).select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            Job.objects.filter(pk=job.pk).update(attempts=job.attempts + 1, **claimed)
+    else:
+        for pk, attempts, status, locked_at in _claimable(now).values_list("pk", "attempts", "status", "locked_at")[:20]:
+            # Only one worker's UPDATE can still match the row as it was read.
+            if Job.objects.filter(pk=pk, status=status, locked_at=locked_at).update(attempts=attempts + 1, **claimed):
+                break
+        else:
+            return None
+        job = Job(pk=pk)
+    job.refresh_from_db()
+    return job
+
+def _owned(job):
+    return Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by)
+
+def _progress(job):
+    def report(done, total=None):
+        fields = {"progress_done": done, "locked_at": timezone.now()}
+        if total is not None:
+            fields["progress_total"] = total
+        _owned(job).update(**fields)
+    return report
+
+class _Heartbeat(threading.Thread):
+    """Renews the job's lease every third of JOB_LEASE_SECONDS until stopped."""
+
+    def __init__(self, job):
+        super().__init__(daemon=True, name=f"job-{job.pk}-heartbeat")
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        interval = getattr(settings, "JOB_LEASE_SECONDS", 900) / 3
+        try:
+            while not self.stopped.wait(interval):
+                try:
+                    _owned(self.job).update(locked_at=timezone.now())
+                except DatabaseError:
+                    pass  # e.g. SQLite locked by the task's own write; try again next beat
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+def backoff(attempts):
+    return timedelta(seconds=getattr(settings, "JOB_RETRY_BASE_SECONDS", 30) * 2 ** (attempts - 1))
+
+def run(job):
+    """Run a claimed job and record its outcome; failures are requeued until max_attempts.
+
+    Returns False on failure, and also when the lease was lost to another
+    worker (whose outcome then stands).
+    """
+    fn = TASKS.get(job.name)
+    heartbeat = _Heartbeat(job)
+    heartbeat.start()
+    try:
+        if fn is None:
+            raise KeyError(f"Unknown job {job.name!r}")
+        result = fn(progress=_progress(job), **job.payload)
+    except Exception:
+        heartbeat.stop()
+        now = timezone.now()
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts and fn is not None:
+            _owned(job).update(
+                status=Job.Status.QUEUED, run_after=now + backoff(job.attempts), error=error, locked_by="", locked_at=None,
+            )
+        else:
+            _owned(job).update(status=Job.Status.FAILED, error=error, finished_at=now, locked_at=None)
+        return False
+    heartbeat.stop()
+    return bool(_owned(job).update(
+        status=Job.Status.SUCCEEDED, result=result, error="", finished_at=timezone.now(), locked_at=None,
+    ))
+
+@task("billing.generate_invoices")
+def generate_invoices(fee_structure, issued_on=None, due_on=None, progress=None):
+    return billing.generate_invoices(
+        FeeStructure.objects.get(pk=fee_structure), issued_on=issued_on, due_on=due_on, progress=progress,
+    )
+
+@task("imports.import_students")
+def import_students(school, csv_text, progress=None):
+    progress(0, max(csv_text.count("\n") - 1, 0))
+    rows = csv.DictReader(io.StringIO(csv_text))
+    return imports.import_students(School.objects.get(pk=school), rows, progress=progress)
+
+@task("gradebook.rebuild_term")
+def rebuild_term(term, progress=None):
+    return {"results": gradebook.rebuild_term(term)}
+
+@task("rollover.rollover_year")
+def rollover_year(source, target=None, starts_on=None, ends_on=None, progress=None, **options):
+    return rollover.rollover(
+        AcademicYear.objects.get(pk=source),
+        target=AcademicYear.objects.get(pk=target) if target else None,
+        starts_on=starts_on and date.fromisoformat(starts_on),
+        ends_on=ends_on and date.fromisoformat(ends_on),
+        progress=progress,
+        **options,
+    )
+
+@task("timetable.generate")
+def generate_timetable(term, progress=None, **options):
+    result = timetable.generate(Term.objects.get(pk=term), **options)
+    return {"timetable": result.pk, "unplaced": result.unplaced, **result.stats}
+
+@task("timetable.resolve")
+def resolve_timetable(timetable_id, progress=None, **options):
+    result = timetable.resolve(Timetable.objects.get(pk=timetable_id), **options)
+    return {"timetable": result.pk, "unplaced": result.unplaced, **result.stats}
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core import billing
+from core.models import Payment
+
+class Command(BaseCommand):
+    help = "Allocate a day's payments FIFO (oldest due first) across students' open invoices."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="paid_on date, YYYY-MM-DD (default: today)")
+        parser.add_argument("--all", action="store_true", help="Allocate every payment regardless of date.")
+
+    def handle(self, *args, **options):
+        payments = Payment.objects.all()
+        if not options["all"]:
+            payments = payments.filter(paid_on=options["date"] or timezone.localdate())
+        result = billing.allocate_payments(list(payments.values_list("pk", flat=True)))
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['payments']} payments: {result['allocations']} allocations, "
+            f"{result['allocated']} allocated, {result['unallocated']} left unallocated."
+        ))
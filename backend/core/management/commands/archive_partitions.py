@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from core import partitions
+from core.models import AcademicYear
+
+class Command(BaseCommand):
+    help = (
+        "Detach attendance/score partitions of closed academic years into the archive schema "
+        "(still readable through archive.<table>_all views), or reattach them with --restore."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, action="append", help="AcademicYear id (repeatable).")
+        parser.add_argument("--closed", action="store_true", help="Every inactive year that has ended.")
+        parser.add_argument("--restore", action="store_true", help="Reattach the given archived years instead.")
+        parser.add_argument("--force", action="store_true", help="Allow archiving an active or unfinished year.")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if not partitions.supported(connection):
+            raise CommandError("Partition archiving needs PostgreSQL; other databases keep one plain table.")
+        if options["restore"]:
+            years = options["year"] or partitions.archived_years()
+        elif options["closed"]:
+            years = list(
+                AcademicYear.objects.filter(is_active=False, ends_on__lt=timezone.localdate()).order_by("id").values_list("id", flat=True)
+            )
+            years = [y for y in years if y not in partitions.archived_years()]
+        else:
+            years = options["year"] or []
+        if not years:
+            raise CommandError("Nothing to do: pass --year, --closed or --restore.")
+
+        if not options["restore"] and not options["force"]:
+            open_years = AcademicYear.objects.filter(id__in=years).exclude(is_active=False, ends_on__lt=timezone.localdate())
+            if open_years.exists():
+                raise CommandError(f"Not closed (use --force): {', '.join(str(y) for y in open_years)}")
+
+        action = partitions.restore_year if options["restore"] else partitions.archive_year
+        verb, past = ("restore", "Restored") if options["restore"] else ("archive", "Archived")
+        for year_id in years:
+            if options["dry_run"]:
+                self.stdout.write(f"Would {verb} academic year {year_id}")
+                continue
+            moved = action(year_id)
+            if not moved:
+                self.stdout.write(f"Academic year {year_id}: no partitions to {verb}")
+                continue
+            rows = ", ".join(f"{table} {count}" for table, count in moved.items())
+            self.stdout.write(f"{past} academic year {year_id}: {rows}")
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,115 @@
+import json
+import math
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from core.models import Assessment, AttendanceSession, School, Section, Student, Term, User
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+class Command(BaseCommand):
+    help = "Time the main API endpoints in-process: p50/p95/p99 latency and SQL queries per request."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--school", help="School code (default: the first LOAD* school from generate_load_data).")
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument("--only", help="Run endpoints whose name contains this text.")
+        parser.add_argument("--cold", action="store_true", help="Clear the cache before every request.")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+
+    def handle(self, *args, **options):
+        schools = School.objects.filter(code=options["school"]) if options["school"] else School.objects.filter(code__startswith="LOAD")
+        school = schools.order_by("id").first()
+        if school is None:
+            raise CommandError("No school to benchmark; run generate_load_data first.")
+
+        results = []
+        with override_settings(ALLOWED_HOSTS=["*"]):
+            for name, role, url in self.endpoints(school):
+                if options["only"] and options["only"] not in name:
+                    continue
+                results.append(self.measure(name, self.client(school, role), url, options))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'endpoint':<34} {'status':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+        for r in results:
+            self.stdout.write(
+                f"{r['endpoint']:<34} {r['status']:>6} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+                f"{r['queries_mean']:>8.1f}"
+            )
+
+    def client(self, school, role):
+        if role == User.Role.STUDENT:
+            user = User.objects.filter(school=school, role=role, student_profile__isnull=False).order_by("id").first()
+        else:
+            user = User.objects.filter(school=school, role=role).order_by("id").first()
+        if user is None:
+            raise CommandError(f"{school.code} has no {role} user.")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        return client
+
+    def endpoints(self, school):
+        term = Term.objects.filter(academic_year__school=school).order_by("-starts_on").first()
+        section = Section.objects.filter(grade__school=school).order_by("id").first()
+        session = AttendanceSession.objects.filter(section=section).order_by("-session_date").first()
+        assessment = Assessment.objects.filter(section=section).order_by("id").first()
+        student = Student.objects.filter(school=school).order_by("id").first()
+        if not (term and section and session and assessment and student):
+            raise CommandError(f"{school.code} has no term data; run generate_load_data first.")
+        admin, teacher, student_role, finance = User.Role.ADMIN, User.Role.TEACHER, User.Role.STUDENT, User.Role.FINANCE
+        return [
+            ("students", admin, "/api/students/"),
+            ("students expanded", admin, "/api/students/?expand=user&fields=id,admission_no,user"),
+            ("student detail", admin, f"/api/students/{student.id}/"),
+            ("enrollments by section", admin, f"/api/enrollments/?section={section.id}&expand=student"),
+            ("subjects (cached)", admin, "/api/subjects/"),
+            ("attendance sessions", teacher, f"/api/attendance-sessions/?section={section.id}"),
+            ("attendance records", teacher, f"/api/attendance-records/?session={session.id}"),
+            ("assessment scores", teacher, f"/api/assessment-scores/?assessment={assessment.id}"),
+            ("term results", admin, f"/api/term-results/?term={term.id}&section={section.id}&overall=true"),
+            ("attendance analytics", admin, f"/api/attendance-analytics/students/?term={term.id}&section={section.id}"),
+            ("chronic absentees", admin, f"/api/attendance-analytics/chronic-absentees/?term={term.id}"),
+            ("outstanding invoices", finance, "/api/invoices/?status=UNPAID,PARTIAL"),
+            ("payments", finance, "/api/payments/?expand=allocations"),
+            ("sync", admin, "/api/sync/?since=0&limit=500"),
+            ("portal dashboard", student_role, "/api/portal/dashboard/"),
+        ]
+
+    def measure(self, name, client, url, options):
+        for _ in range(options["warmup"]):
+            client.get(url)
+        timings, queries = [], []
+        status = None
+        for _ in range(options["iterations"]):
+            if options["cold"]:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                began = time.perf_counter()
+                response = client.get(url)
+                if getattr(response, "streaming", False):
+                    b"".join(response.streaming_content)
+                timings.append((time.perf_counter() - began) * 1000)
+            queries.append(len(captured))
+            status = response.status_code
+        timings.sort()
+        return {
+            "endpoint": name,
+            "url": url,
+            "status": status,
+            "p50_ms": round(percentile(timings, 50), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "p99_ms": round(percentile(timings, 99), 2),
+            "queries_mean": round(sum(queries) / len(queries), 1),
+            "queries_max": max(queries),
+        }
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from core import gradebook
+from core.models import Term
+
+class Command(BaseCommand):
+    help = "Rebuild materialized term results (weighted marks, ranks, percentiles)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--term", type=int, action="append", help="Term id (repeatable). Defaults to all terms.")
+
+    def handle(self, *args, **options):
+        term_ids = options["term"] or list(Term.objects.values_list("id", flat=True))
+        missing = set(term_ids) - set(Term.objects.filter(id__in=term_ids).values_list("id", flat=True))
+        if missing:
+            raise CommandError(f"Unknown term id(s): {sorted(missing)}")
+        for term_id in term_ids:
+            rows = gradebook.rebuild_term(term_id)
+            self.stdout.write(f"Term {term_id}: {rows} results")
+        self.stdout.write(self.style.SUCCESS("Term results rebuilt."))
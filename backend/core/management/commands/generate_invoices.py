@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from core import billing
+from core.models import FeeStructure
+
+class Command(BaseCommand):
+    help = "Invoice every active enrollment covered by a fee structure (safe to re-run)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("fee_structure", type=int, help="FeeStructure id")
+        parser.add_argument("--issued-on", help="YYYY-MM-DD (default: today)")
+        parser.add_argument("--due-on", help="YYYY-MM-DD")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            fs = FeeStructure.objects.get(pk=options["fee_structure"])
+        except FeeStructure.DoesNotExist:
+            raise CommandError(f"FeeStructure {options['fee_structure']} does not exist")
+
+        def progress(done, total):
+            self.stdout.write(f"  {done}/{total} students")
+
+        result = billing.generate_invoices(
+            fs,
+            issued_on=options["issued_on"],
+            due_on=options["due_on"],
+            chunk_size=options["chunk_size"],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['invoices_created']} invoices created, {result['already_invoiced']} already invoiced."
+        ))
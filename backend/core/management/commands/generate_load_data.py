@@ -0,0 +1,200 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core import billing, caching, gradebook, search
+from core.models import (
+    AcademicYear, Assessment, AssessmentScore, AttendanceRecord, AttendanceSession, Enrollment, FeeHead, FeeStructure,
+    FeeStructureItem, Grade, Payment, School, Section, Student, Subject, Teacher, TeacherAssignment, Term, User,
+)
+
+FIRST_NAMES = ["Amina", "Ben", "Chen", "Dara", "Eli", "Fatima", "Gus", "Hana", "Ivan", "Jade", "Kofi", "Lena", "Mo", "Nia", "Omar", "Priya"]
+LAST_NAMES = ["Adams", "Bello", "Cruz", "Diallo", "Evans", "Fischer", "Garcia", "Huang", "Ito", "Jones", "Khan", "Lopez", "Mensah", "Novak"]
+SUBJECTS = ["Mathematics", "English", "Science", "History", "Geography", "Art", "Music", "Computing", "French", "Biology"]
+STATUSES = [AttendanceRecord.Status.PRESENT] * 18 + [AttendanceRecord.Status.ABSENT, AttendanceRecord.Status.LATE]
+
+class Command(BaseCommand):
+    help = "Bulk-load synthetic schools for capacity planning (students, a term of attendance, scores, invoices, payments)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schools", type=int, default=1)
+        parser.add_argument("--students", type=int, default=1000, help="Students per school.")
+        parser.add_argument("--grades", type=int, default=4)
+        parser.add_argument("--sections", type=int, default=3, help="Sections per grade.")
+        parser.add_argument("--subjects", type=int, default=6)
+        parser.add_argument("--assessments", type=int, default=3, help="Assessments per subject per section.")
+        parser.add_argument("--days", type=int, default=60, help="School days of attendance in the term.")
+        parser.add_argument("--paying", type=float, default=0.7, help="Share of students who have made a payment.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.password = make_password("Passw0rd!")  # hashed once, shared by every generated login
+        start = School.objects.filter(code__startswith="LOAD").count()
+        for n in range(start + 1, start + options["schools"] + 1):
+            began = time.monotonic()
+            school = self.load_school(n, options)
+            self.stdout.write(self.style.SUCCESS(f"School {school.code} loaded in {time.monotonic() - began:.1f}s"))
+        caching.invalidate_reference_data()
+
+    def step(self, label, fn, *args):
+        began = time.monotonic()
+        result = fn(*args)
+        self.stdout.write(f"  {label}: {result} rows in {time.monotonic() - began:.1f}s")
+
+    def bulk(self, model, rows):
+        """bulk_create an iterable in batches without materializing it; returns the row count."""
+        count, batch = 0, []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                count, batch = count + len(batch), []
+        model.objects.bulk_create(batch)
+        return count + len(batch)
+
+    def school_days(self, first, days):
+        day = first
+        while days:
+            if day.weekday() < 5:
+                yield day
+                days -= 1
+            day += timedelta(days=1)
+
+    @transaction.atomic
+    def setup_school(self, n, options):
+        code = f"LOAD{n:03d}"
+        school = School.objects.create(name=f"Load Test School {n}", code=code)
+        year = AcademicYear.objects.create(school=school, name="2025/2026", starts_on=date(2025, 9, 1), ends_on=date(2026, 7, 15), is_active=True)
+        days = list(self.school_days(date(2025, 9, 1), options["days"]))
+        term = Term.objects.create(academic_year=year, name="Term 1", starts_on=days[0], ends_on=days[-1])
+        grades = Grade.objects.bulk_create([Grade(school=school, name=f"Grade {g}", sort_order=g) for g in range(1, options["grades"] + 1)])
+        sections = Section.objects.bulk_create([
+            Section(grade=grade, name=chr(ord("A") + s)) for grade in grades for s in range(options["sections"])
+        ])
+        subjects = Subject.objects.bulk_create([
+            Subject(school=school, name=SUBJECTS[i % len(SUBJECTS)] + (f" {i // len(SUBJECTS) + 1}" if i >= len(SUBJECTS) else ""), code=f"S{i:02d}")
+            for i in range(options["subjects"])
+        ])
+
+        staff = User.objects.bulk_create([
+            User(email=f"{role.lower()}@{code.lower()}.example.com", role=role, school=school, is_staff=True, is_active=True, password=self.password)
+            for role in (User.Role.ADMIN, User.Role.REGISTRAR, User.Role.FINANCE)
+        ])
+        teacher_users = User.objects.bulk_create([
+            User(email=f"teacher{i}@{code.lower()}.example.com", role=User.Role.TEACHER, school=school, is_staff=True, is_active=True, password=self.password)
+            for i in range(len(subjects))
+        ])
+        teachers = Teacher.objects.bulk_create([
+            Teacher(school=school, user=u, staff_no=f"T{i:03d}", first_name=self.rng.choice(FIRST_NAMES), last_name=self.rng.choice(LAST_NAMES))
+            for i, u in enumerate(teacher_users)
+        ])
+        TeacherAssignment.objects.bulk_create([
+            TeacherAssignment(teacher=teachers[i], term=term, section=section, subject=subject)
+            for section in sections for i, subject in enumerate(subjects)
+        ])
+
+        heads = FeeHead.objects.bulk_create([FeeHead(school=school, name=name) for name in ("Tuition", "Exam Fee", "Activities")])
+        structures = FeeStructure.objects.bulk_create([
+            FeeStructure(academic_year=year, grade=grade, name=f"{grade.name} fees") for grade in grades
+        ])
+        FeeStructureItem.objects.bulk_create([
+            FeeStructureItem(fee_structure=fs, fee_head=head, amount=Decimal(amount) + 50 * fs.grade.sort_order)
+            for fs in structures for head, amount in zip(heads, ("1200", "150", "80"))
+        ])
+        return school, year, term, days, sections, subjects, structures, staff
+
+    def load_school(self, n, options):
+        school, year, term, days, sections, subjects, structures, staff = self.setup_school(n, options)
+        self.stdout.write(f"{school.code}: {len(sections)} sections, {len(subjects)} subjects, {len(days)} days")
+        rng = self.rng
+
+        students = []
+        def load_students():
+            count = options["students"]
+            # The first few students get logins so portal endpoints can be benchmarked.
+            users = User.objects.bulk_create([
+                User(email=f"student{i}@{school.code.lower()}.example.com", role=User.Role.STUDENT, school=school, is_active=True, password=self.password)
+                for i in range(min(count, 10))
+            ])
+            for start in range(0, count, self.batch_size):
+                students.extend(Student.objects.bulk_create([
+                    Student(
+                        school=school,
+                        user=users[i] if i < len(users) else None,
+                        admission_no=f"{school.code}-{i:06d}",
+                        first_name=rng.choice(FIRST_NAMES),
+                        last_name=rng.choice(LAST_NAMES),
+                        dob=date(2010, 1, 1) + timedelta(days=rng.randrange(2500)),
+                    )
+                    for i in range(start, min(start + self.batch_size, count))
+                ]))
+            search.invalidate(school.pk)
+            return len(students)
+        self.step("students", load_students)
+
+        by_section = {section.id: [] for section in sections}
+        for i, student in enumerate(students):
+            by_section[sections[i % len(sections)].id].append(student.id)
+        self.step("enrollments", self.bulk, Enrollment, (
+            Enrollment(school=school, student_id=student_id, academic_year=year, section_id=section_id, enrolled_on=year.starts_on)
+            for section_id, ids in by_section.items() for student_id in ids
+        ))
+
+        sessions = []
+        def load_sessions():
+            sessions.extend(AttendanceSession.objects.bulk_create([
+                AttendanceSession(school=school, term=term, section_id=section_id, session_date=day, created_by=staff[0])
+                for section_id in by_section for day in days
+            ], batch_size=self.batch_size))
+            return len(sessions)
+        self.step("attendance sessions", load_sessions)
+        self.step("attendance records", self.bulk, AttendanceRecord, (
+            AttendanceRecord(session_id=session.id, student_id=student_id, status=rng.choice(STATUSES), academic_year=year, school=school)
+            for session in sessions for student_id in by_section[session.section_id]
+        ))
+
+        assessments = []
+        def load_assessments():
+            assessments.extend(Assessment.objects.bulk_create([
+                Assessment(term=term, section_id=section_id, subject=subject, name=f"Test {k + 1}", max_score=Decimal(max_score), weight=Decimal(weight))
+                for section_id in by_section for subject in subjects
+                for k, (max_score, weight) in enumerate([("20", "1"), ("50", "1"), ("100", "2")][:options["assessments"]] or [("100", "1")])
+            ]))
+            return len(assessments)
+        self.step("assessments", load_assessments)
+        self.step("assessment scores", self.bulk, AssessmentScore, (
+            AssessmentScore(
+                assessment_id=a.id, student_id=student_id, graded_by=staff[0], academic_year=year, school=school,
+                score=(a.max_score * Decimal(min(1.0, max(0.0, rng.gauss(0.68, 0.15))))).quantize(Decimal("0.01")),
+            )
+            for a in assessments for student_id in by_section[a.section_id]
+        ))
+        self.step("term results", gradebook.rebuild_term, term.id)
+
+        self.step("invoices", lambda: sum(
+            billing.generate_invoices(fs, issued_on=term.starts_on, due_on=term.starts_on + timedelta(days=30), chunk_size=self.batch_size)["invoices_created"]
+            for fs in structures
+        ))
+        payments = []
+        def load_payments():
+            payments.extend(Payment.objects.bulk_create([
+                Payment(
+                    school=school, student_id=student.id, paid_on=term.starts_on + timedelta(days=rng.randrange(60)),
+                    method=rng.choice(["CASH", "BANK", "MOBILE"]), amount=Decimal(rng.choice([500, 1000, 1500, 2000])),
+                )
+                for student in students if rng.random() < options["paying"]
+            ], batch_size=self.batch_size))
+            return len(payments)
+        self.step("payments", load_payments)
+        self.step("allocations", lambda: sum(
+            billing.allocate_payments([p.id for p in payments[i:i + 2000]])["allocations"]
+            for i in range(0, len(payments), 2000)
+        ))
+        return school
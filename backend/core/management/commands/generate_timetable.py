@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from core import timetable
+from core.models import Term, Timetable
+
+class Command(BaseCommand):
+    help = (
+        "Build the weekly timetable of a term from its teacher assignments, or with --resolve repair the "
+        "stored one after the given assignments changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--term", type=int, required=True)
+        parser.add_argument("--days", type=int)
+        parser.add_argument("--periods-per-day", type=int)
+        parser.add_argument("--time-budget", type=float, help="Seconds (default TIMETABLE_TIME_BUDGET).")
+        parser.add_argument("--seed", type=int)
+        parser.add_argument("--resolve", type=int, action="append", metavar="ASSIGNMENT",
+                            help="Only re-place this assignment's lessons (repeatable).")
+
+    def handle(self, *args, **options):
+        solver_options = {"time_budget": options["time_budget"], "seed": options["seed"]}
+        if options["resolve"]:
+            tt = Timetable.objects.filter(term_id=options["term"]).first()
+            if tt is None:
+                raise CommandError(f"Term {options['term']} has no timetable yet; generate one first.")
+            tt = timetable.resolve(tt, assignments=options["resolve"], **solver_options)
+        else:
+            try:
+                term = Term.objects.get(pk=options["term"])
+            except Term.DoesNotExist:
+                raise CommandError(f"Term {options['term']} not found.")
+            tt = timetable.generate(term, days=options["days"], periods_per_day=options["periods_per_day"], **solver_options)
+
+        stats = tt.stats
+        self.stdout.write(
+            f"{stats['lessons']} lessons on {tt.days}x{tt.periods_per_day}: {tt.unplaced} unplaced "
+            f"(greedy left {stats['greedy_unplaced']}, {stats['iterations']} repair steps, {stats['seconds']}s), "
+            f"{stats['changed']} entries changed"
+        )
+        for assignment, count in stats["unplaced_assignments"].items():
+            self.stdout.write(self.style.WARNING(f"  assignment {assignment}: {count} lesson(s) not placed"))
+        self.stdout.write(self.style.SUCCESS(f"Timetable {tt.pk} saved."))
@@ -0,0 +1,35 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from core import imports
+from core.models import School
+
+class Command(BaseCommand):
+    help = "Import students (with optional logins and enrollments) from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row")
+        parser.add_argument("--school", required=True, help="School code or id")
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--report", help="Write the full JSON report to this file")
+
+    def handle(self, *args, **options):
+        school = School.objects.filter(code=options["school"]).first()
+        if school is None and options["school"].isdigit():
+            school = School.objects.filter(pk=options["school"]).first()
+        if school is None:
+            raise CommandError(f"Unknown school '{options['school']}'")
+
+        with open(options["path"], newline="", encoding="utf-8-sig") as fh:
+            report = imports.import_students(school, csv.DictReader(fh), chunk_size=options["chunk_size"])
+
+        if options["report"]:
+            with open(options["report"], "w") as out:
+                json.dump(report, out, indent=2)
+        for err in report["errors"][:20]:
+            self.stdout.write(self.style.WARNING(f"  row {err['row']}: {err['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['rows']} rows: {report['created']} students created "
+            f"({report['enrolled']} enrolled), {len(report['errors'])} rejected."
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from core import billing
+
+class Command(BaseCommand):
+    help = "Rebuild invoice total/paid/balance/status from items and allocations, reporting drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it.")
+
+    def handle(self, *args, **options):
+        drifted = billing.reconcile_invoices(fix=not options["dry_run"])
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("No drift: all invoice totals match their items and allocations."))
+            return
+        sample = ", ".join(str(pk) for pk in drifted[:20])
+        more = f" (+{len(drifted) - 20} more)" if len(drifted) > 20 else ""
+        self.stdout.write(self.style.WARNING(f"{len(drifted)} invoice(s) drifted: {sample}{more}"))
+        if not options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS("Drifted invoices rebuilt."))
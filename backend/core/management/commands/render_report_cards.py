@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from core import reportcards
+from core.models import Section, Term
+
+class Command(BaseCommand):
+    help = "Render report cards for a section or a whole grade into a zip."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--term", type=int, required=True)
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument("--section", type=int)
+        scope.add_argument("--grade", type=int)
+        parser.add_argument("--format", choices=sorted(reportcards.FORMATS), default="html")
+        parser.add_argument("--workers", type=int, default=0, help="Rendering processes (default: REPORT_CARD_WORKERS or one per CPU).")
+        parser.add_argument("--output", required=True, help="Path of the zip to write.")
+
+    def handle(self, *args, **options):
+        term = Term.objects.filter(pk=options["term"]).first()
+        if term is None:
+            raise CommandError(f"Unknown term id: {options['term']}")
+        if options["format"] == "pdf" and not reportcards.pdf_available():
+            raise CommandError("PDF rendering requires WeasyPrint (pip install weasyprint).")
+        sections = Section.objects.filter(pk=options["section"]) if options["section"] else Section.objects.filter(grade_id=options["grade"])
+        section_ids = list(sections.values_list("id", flat=True))
+        if not section_ids:
+            raise CommandError("No matching sections.")
+
+        started = time.monotonic()
+        cards = reportcards.collect(term, section_ids)
+        collected = time.monotonic()
+        archive = reportcards.build_zip(cards, options["format"], options["workers"] or None)
+        with archive, open(options["output"], "wb") as out:
+            while chunk := archive.read(1 << 20):
+                out.write(chunk)
+        finished = time.monotonic()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(cards)} report cards -> {options['output']} "
+            f"(data {collected - started:.1f}s, render {finished - collected:.1f}s)"
+        ))
@@ -0,0 +1,67 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from core import rollover
+from core.models import AcademicYear
+
+def _ids(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+class Command(BaseCommand):
+    help = (
+        "Promote every ACTIVE enrollment of an academic year into the next grade of a new (or existing) year, "
+        "cloning terms, fee structures and teacher assignments. Use --dry-run to print the diff only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="source", type=int, required=True, help="AcademicYear id to roll over.")
+        parser.add_argument("--to", dest="target", type=int, help="Existing AcademicYear id to roll into.")
+        parser.add_argument("--name", help="Name of the new year, e.g. 2026/2027.")
+        parser.add_argument("--starts-on", type=date.fromisoformat)
+        parser.add_argument("--ends-on", type=date.fromisoformat)
+        parser.add_argument("--repeat", type=_ids, default=[], help="Comma-separated student ids kept in their section.")
+        parser.add_argument("--leave", type=_ids, default=[], help="Comma-separated student ids marked LEFT.")
+        parser.add_argument("--no-clone", action="append", choices=rollover.CLONABLE, default=[])
+        parser.add_argument("--activate", action="store_true", help="Make the new year the active one.")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        try:
+            source = AcademicYear.objects.get(pk=options["source"])
+        except AcademicYear.DoesNotExist:
+            raise CommandError(f"Academic year {options['source']} not found.")
+        target = None
+        if options["target"]:
+            target = AcademicYear.objects.filter(pk=options["target"], school_id=source.school_id).exclude(pk=source.pk).first()
+            if target is None:
+                raise CommandError(f"Academic year {options['target']} is not another year of the same school.")
+        elif not (options["name"] and options["starts_on"] and options["ends_on"]):
+            raise CommandError("Pass --to, or --name with --starts-on and --ends-on.")
+        elif AcademicYear.objects.filter(school_id=source.school_id, name=options["name"]).exists():
+            raise CommandError(f"Academic year {options['name']!r} already exists.")
+        if set(options["repeat"]) & set(options["leave"]):
+            raise CommandError("A student cannot both repeat and leave.")
+
+        result = rollover.rollover(
+            source,
+            target=target,
+            name=options["name"],
+            starts_on=options["starts_on"],
+            ends_on=options["ends_on"],
+            repeat=options["repeat"],
+            leave=options["leave"],
+            clone=[c for c in rollover.CLONABLE if c not in options["no_clone"]],
+            activate=options["activate"],
+            dry_run=options["dry_run"],
+        )
+        for move in result["moves"]:
+            to = move["to"] or "-"
+            self.stdout.write(f"  {move['from']:<24} -> {to:<24} {move['outcome']:<17} {move['students']:>7}")
+        for key in (rollover.PROMOTED, rollover.REPEATED, rollover.GRADUATED, rollover.LEFT, rollover.ENROLLED):
+            self.stdout.write(f"{key}: {result[key]}")
+        for key, count in result["cloned"].items():
+            self.stdout.write(f"cloned {key}: {count}")
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run: nothing was written."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rolled academic year {source.pk} into {result['target']}."))
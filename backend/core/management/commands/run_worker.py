@@ -0,0 +1,39 @@
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core import jobs
+
+class Command(BaseCommand):
+    help = "Run background jobs from the jobs table until stopped (SIGTERM/SIGINT finish the current job first)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+        parser.add_argument("--max-jobs", type=int, default=0, help="Exit after this many jobs (0 = no limit).")
+
+    def handle(self, *args, **options):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        stopping = []
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, lambda *_: stopping.append(True))
+        self.stdout.write(f"Worker {worker_id} started.")
+
+        done = 0
+        while not stopping:
+            close_old_connections()
+            job = jobs.claim(worker_id)
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+                continue
+            ok = jobs.run(job)
+            self.stdout.write(f"{job.name} #{job.pk} attempt {job.attempts}: {'ok' if ok else 'failed'}")
+            done += 1
+            if options["max_jobs"] and done >= options["max_jobs"]:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} stopped after {done} job(s)."))
@@ -0,0 +1,160 @@
+"""Per-route request latency and SQL instrumentation, exposed as Prometheus text.
+
+Counters live in process memory, so each gunicorn worker reports its own
+numbers (label them per instance in the scraper). Under ASGI the middleware
+stays async; the SQL tracker is installed on the connections of the thread
+that runs the request's sync_to_async ORM calls (one per request).
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+class _QueryTracker:
+    """connection.execute_wrapper that counts and times every statement."""
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+class _RouteStats:
+    __slots__ = ("requests", "errors", "latency_sum", "buckets", "queries", "sql_seconds", "over_budget")
+
+    def __init__(self):
+        self.requests = self.errors = self.queries = self.over_budget = 0
+        self.latency_sum = self.sql_seconds = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+_stats = {}
+_lock = threading.Lock()
+
+def _route(request):
+    """(view, action, method) labels: URL name plus the DRF viewset action, if any."""
+    match = request.resolver_match
+    if match is None:
+        return "unmatched", "", request.method
+    actions = getattr(match.func, "actions", None) or {}
+    return match.url_name or match.route, actions.get(request.method.lower(), ""), request.method
+
+def _record(labels, seconds, tracker, status_code, over_budget):
+    with _lock:
+        stats = _stats.get(labels)
+        if stats is None:
+            stats = _stats[labels] = _RouteStats()
+        stats.requests += 1
+        stats.errors += status_code >= 500
+        stats.latency_sum += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                stats.buckets[i] += 1
+        stats.queries += tracker.count
+        stats.sql_seconds += tracker.seconds
+        stats.over_budget += over_budget
+
+def _query_budget(request):
+    cls = getattr(getattr(request.resolver_match, "func", None), "cls", None)
+    return getattr(cls, "query_budget", None) or getattr(settings, "QUERY_BUDGET", None)
+
+def _track(stack, tracker):
+    for conn in connections.all():
+        stack.enter_context(conn.execute_wrapper(tracker))
+
+class QueryMetricsMiddleware:
+    """Records latency, SQL count and SQL time per route/action; flags requests over the query budget."""
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tracker = _QueryTracker()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            _track(stack, tracker)
+            response = self.get_response(request)
+        return self._finish(request, response, time.perf_counter() - start, tracker)
+
+    async def __acall__(self, request):
+        tracker = _QueryTracker()
+        start = time.perf_counter()
+        stack = ExitStack()
+        # Connections are per thread: wrap those of the request's sync_to_async thread.
+        await sync_to_async(_track)(stack, tracker)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._finish(request, response, time.perf_counter() - start, tracker)
+
+    def _finish(self, request, response, elapsed, tracker):
+        budget = _query_budget(request)
+        over_budget = bool(budget) and tracker.count > budget
+        _record(_route(request), elapsed, tracker, response.status_code, over_budget)
+        if settings.DEBUG:
+            response["X-Query-Count"] = str(tracker.count)
+        if over_budget:
+            response["X-Query-Budget-Exceeded"] = f"{tracker.count}/{budget}"
+            logger.warning("%s %s ran %d queries (budget %d)", request.method, request.path, tracker.count, budget)
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(f"{request.method} {request.path} ran {tracker.count} queries (budget {budget})")
+        return response
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_prometheus():
+    with _lock:
+        snapshot = [(labels, s.requests, s.errors, s.latency_sum, list(s.buckets), s.queries, s.sql_seconds, s.over_budget)
+                    for labels, s in sorted(_stats.items())]
+    metrics = {
+        "http_requests_total": ("counter", "Requests handled."),
+        "http_request_errors_total": ("counter", "Requests that returned a 5xx status."),
+        "http_request_duration_seconds": ("histogram", "Request latency."),
+        "db_queries_total": ("counter", "SQL statements executed."),
+        "db_query_duration_seconds_total": ("counter", "Time spent executing SQL."),
+        "query_budget_exceeded_total": ("counter", "Requests that ran more queries than their budget."),
+    }
+    lines = {name: [f"# HELP school_erp_{name} {help}", f"# TYPE school_erp_{name} {kind}"] for name, (kind, help) in metrics.items()}
+    for (view, action, method), requests, errors, latency_sum, buckets, queries, sql_seconds, over in snapshot:
+        labels = f'view="{_escape(view)}",action="{_escape(action)}",method="{method}"'
+        lines["http_requests_total"].append(f"school_erp_http_requests_total{{{labels}}} {requests}")
+        lines["http_request_errors_total"].append(f"school_erp_http_request_errors_total{{{labels}}} {errors}")
+        hist = lines["http_request_duration_seconds"]
+        for bound, count in zip(LATENCY_BUCKETS, buckets):
+            hist.append(f'school_erp_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        hist.append(f'school_erp_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {requests}')
+        hist.append(f"school_erp_http_request_duration_seconds_sum{{{labels}}} {latency_sum:.6f}")
+        hist.append(f"school_erp_http_request_duration_seconds_count{{{labels}}} {requests}")
+        lines["db_queries_total"].append(f"school_erp_db_queries_total{{{labels}}} {queries}")
+        lines["db_query_duration_seconds_total"].append(f"school_erp_db_query_duration_seconds_total{{{labels}}} {sql_seconds:.6f}")
+        lines["query_budget_exceeded_total"].append(f"school_erp_query_budget_exceeded_total{{{labels}}} {over}")
+    return "\n".join(line for block in lines.values() for line in block) + "\n"
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; restricted to METRICS_ALLOWED_IPS."""
+    if request.META.get("REMOTE_ADDR") not in getattr(settings, "METRICS_ALLOWED_IPS", ()):
+        return HttpResponseForbidden("Forbidden")
+    return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('percentage', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('rank', models.PositiveIntegerField()),
+                ('percentile', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_results', to='core.section')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_results', to='core.student')),
+                ('subject', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='term_results', to='core.subject')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='core.term')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'section', 'subject', 'rank'], name='core_termre_term_id_cab7fa_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('subject__isnull', False)), fields=('term', 'section', 'subject', 'student'), name='uniq_term_result_subject'), models.UniqueConstraint(condition=models.Q(('subject__isnull', True)), fields=('term', 'section', 'student'), name='uniq_term_result_overall')],
+            },
+        ),
+    ]
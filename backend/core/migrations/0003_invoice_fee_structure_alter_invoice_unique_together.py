@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_termresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='fee_structure',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='core.feestructure'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='invoice',
+            unique_together={('student', 'fee_structure')},
+        ),
+    ]
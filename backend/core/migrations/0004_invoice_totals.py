@@ -0,0 +1,57 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:02
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Case, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    Invoice = apps.get_model("core", "Invoice")
+    InvoiceItem = apps.get_model("core", "InvoiceItem")
+    PaymentAllocation = apps.get_model("core", "PaymentAllocation")
+
+    def summed(model):
+        sub = model.objects.filter(invoice=OuterRef("pk")).values("invoice").annotate(s=Sum("amount")).values("s")
+        return Coalesce(Subquery(sub), Value(Decimal("0")), output_field=models.DecimalField(max_digits=12, decimal_places=2))
+
+    Invoice.objects.update(total=summed(InvoiceItem), paid=summed(PaymentAllocation))
+    Invoice.objects.update(
+        balance=models.F("total") - models.F("paid"),
+        status=Case(
+            When(total__gt=0, total__lte=models.F("paid"), then=Value("PAID")),
+            When(paid__gt=0, then=Value("PARTIAL")),
+            default=Value("UNPAID"),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_invoice_fee_structure_alter_invoice_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='balance',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(condition=models.Q(('balance__gt', 0)), fields=['student', 'due_on'], name='invoice_outstanding_idx'),
+        ),
+    ]
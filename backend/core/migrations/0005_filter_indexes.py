@@ -0,0 +1,57 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_invoice_totals'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['term', 'section', 'subject'], name='assessment_term_section_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessmentscore',
+            index=models.Index(fields=['student', 'assessment'], name='score_student_assessment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['student', 'session'], name='attrecord_student_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['section', 'session_date'], name='attsession_section_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['academic_year', 'section', 'status'], name='enrollment_year_section_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['student', 'status', 'due_on'], name='invoice_student_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['status', 'due_on'], name='invoice_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['student', 'paid_on'], name='payment_student_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['paid_on'], name='payment_paid_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school', 'last_name'], name='student_school_lastname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacherassignment',
+            index=models.Index(fields=['term', 'section'], name='assignment_term_section_idx'),
+        ),
+    ]
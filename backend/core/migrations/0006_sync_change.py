@@ -0,0 +1,31 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=40)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('school', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.school')),
+                ('section', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.section')),
+                ('student', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', 'seq'], name='syncchange_school_seq_idx'), models.Index(fields=['section', 'seq'], name='syncchange_section_seq_idx'), models.Index(fields=['student', 'seq'], name='syncchange_student_seq_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_academic_year(apps, schema_editor):
+    AttendanceRecord = apps.get_model("core", "AttendanceRecord")
+    AttendanceSession = apps.get_model("core", "AttendanceSession")
+    AssessmentScore = apps.get_model("core", "AssessmentScore")
+    Assessment = apps.get_model("core", "Assessment")
+    AttendanceRecord.objects.update(academic_year_id=Subquery(
+        AttendanceSession.objects.filter(pk=OuterRef("session_id")).values("term__academic_year_id")[:1]
+    ))
+    AssessmentScore.objects.update(academic_year_id=Subquery(
+        Assessment.objects.filter(pk=OuterRef("assessment_id")).values("term__academic_year_id")[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="attendancerecord",
+            name="academic_year",
+            field=models.ForeignKey(
+                editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="core.academicyear",
+            ),
+        ),
+        migrations.AddField(
+            model_name="assessmentscore",
+            name="academic_year",
+            field=models.ForeignKey(
+                editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="core.academicyear",
+            ),
+        ),
+        migrations.RunPython(backfill_academic_year, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="attendancerecord",
+            name="academic_year",
+            field=models.ForeignKey(
+                editable=False, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="core.academicyear",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="assessmentscore",
+            name="academic_year",
+            field=models.ForeignKey(
+                editable=False, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="core.academicyear",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="attendancerecord",
+            unique_together={("session", "student", "academic_year")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="assessmentscore",
+            unique_together={("assessment", "student", "academic_year")},
+        ),
+    ]
@@ -0,0 +1,96 @@
+"""Turn core_attendancerecord and core_assessmentscore into LIST-partitioned tables (PostgreSQL only).
+
+The helpers are a frozen copy of what core.partitions did when this migration
+was written, so later changes to that module cannot alter how it runs.
+"""
+import re
+
+from django.db import migrations
+
+TABLES = ("core_attendancerecord", "core_assessmentscore")
+PARTITION_KEY = "academic_year_id"
+
+
+def _is_partitioned(cursor, table):
+    cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table])
+    return cursor.fetchone() is not None
+
+
+def _definitions(cursor, table):
+    """(constraints, indexes) DDL of `table` as (name, kind, definition) / (name, CREATE INDEX ...)."""
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass ORDER BY contype",
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(x.indexrelid)
+        FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+        """,
+        [table],
+    )
+    return constraints, cursor.fetchall()
+
+
+def _rebuild(schema_editor, cursor, table, partitioned, year_ids=()):
+    """Recreate `table` as a partitioned table (or back as a plain one), keeping its rows and DDL."""
+    q = schema_editor.quote_name
+    old = f"{table}_rebuild"
+    cursor.execute(f"ALTER TABLE {q(table)} RENAME TO {q(old)}")
+    partitioning = f" PARTITION BY LIST ({q(PARTITION_KEY)})" if partitioned else ""
+    cursor.execute(f"CREATE TABLE {q(table)} (LIKE {q(old)} INCLUDING DEFAULTS){partitioning}")
+    if partitioned:
+        for year_id in year_ids:
+            cursor.execute(f"CREATE TABLE {q(f'{table}_y{year_id}')} PARTITION OF {q(table)} FOR VALUES IN (%s)" % int(year_id))
+        cursor.execute(f"CREATE TABLE {q(table + '_default')} PARTITION OF {q(table)} DEFAULT")
+    cursor.execute(f"INSERT INTO {q(table)} SELECT * FROM {q(old)}")
+
+    constraints, indexes = _definitions(cursor, old)
+    cursor.execute(f"DROP TABLE {q(old)} CASCADE")  # takes the old partitions with it
+
+    # The id column lost its identity/sequence default with the old table.
+    sequence = f"{table}_id_seq"
+    cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {q(sequence)} OWNED BY {q(table)}.id")
+    cursor.execute(f"ALTER TABLE {q(table)} ALTER COLUMN id SET DEFAULT nextval(%s)", [sequence])
+    cursor.execute(f"SELECT setval(%s, COALESCE((SELECT MAX(id) FROM {q(table)}), 0) + 1, false)", [sequence])
+
+    for name, kind, definition in constraints:
+        if kind == "p":
+            definition = f"PRIMARY KEY (id, {PARTITION_KEY})" if partitioned else "PRIMARY KEY (id)"
+        cursor.execute(f"ALTER TABLE {q(table)} ADD CONSTRAINT {q(name)} {definition}")
+    for name, definition in indexes:
+        cursor.execute(re.sub(rf" ON (ONLY )?(\S+\.)?{re.escape(old)} ", f" ON {q(table)} ", definition, count=1))
+
+
+def partition(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    AcademicYear = apps.get_model("core", "AcademicYear")
+    year_ids = list(AcademicYear.objects.using(schema_editor.connection.alias).values_list("id", flat=True))
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            if not _is_partitioned(cursor, table):
+                _rebuild(schema_editor, cursor, table, partitioned=True, year_ids=year_ids)
+
+
+def unpartition(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in TABLES:
+            if _is_partitioned(cursor, table):
+                _rebuild(schema_editor, cursor, table, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_partition_key_academic_year"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition, unpartition),
+    ]
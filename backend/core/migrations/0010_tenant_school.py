@@ -0,0 +1,62 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+# model name -> path from the row to its school
+TENANT_TABLES = {
+    "enrollment": "student__school_id",
+    "attendancesession": "section__grade__school_id",
+    "attendancerecord": "student__school_id",
+    "assessmentscore": "student__school_id",
+    "invoice": "student__school_id",
+    "payment": "student__school_id",
+}
+
+
+def backfill_school(apps, schema_editor):
+    for model_name, path in TENANT_TABLES.items():
+        Model = apps.get_model("core", model_name)
+        Model.objects.update(school_id=Subquery(Model.objects.filter(pk=OuterRef("pk")).values(path)[:1]))
+
+
+def school_field(null):
+    return models.ForeignKey(
+        db_index=False, editable=False, null=null, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="core.school",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_partition_attendance_scores"),
+    ]
+
+    operations = [
+        *[migrations.AddField(model_name=name, name="school", field=school_field(null=True)) for name in TENANT_TABLES],
+        migrations.RunPython(backfill_school, migrations.RunPython.noop),
+        *[migrations.AlterField(model_name=name, name="school", field=school_field(null=False)) for name in TENANT_TABLES],
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(fields=["school", "academic_year", "status"], name="enrollment_school_year_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="attendancesession",
+            index=models.Index(fields=["school", "session_date"], name="attsession_school_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="attendancerecord",
+            index=models.Index(fields=["school", "id"], name="attrecord_school_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="assessmentscore",
+            index=models.Index(fields=["school", "id"], name="score_school_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(fields=["school", "status", "due_on"], name="invoice_school_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(fields=["school", "paid_on"], name="payment_school_paid_idx"),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_tenant_school'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teacherassignment',
+            name='periods_per_week',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.CreateModel(
+            name='Timetable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('days', models.PositiveSmallIntegerField(default=5)),
+                ('periods_per_day', models.PositiveSmallIntegerField(default=8)),
+                ('unplaced', models.PositiveIntegerField(default=0)),
+                ('stats', models.JSONField(blank=True, default=dict)),
+                ('generated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('term', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='timetable', to='core.term')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TimetableEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.PositiveSmallIntegerField()),
+                ('period', models.PositiveSmallIntegerField()),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timetable_entries', to='core.teacherassignment')),
+                ('section', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.section')),
+                ('teacher', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.teacher')),
+                ('timetable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='core.timetable')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('timetable', 'teacher', 'day', 'period'), name='timetable_teacher_slot'), models.UniqueConstraint(fields=('timetable', 'section', 'day', 'period'), name='timetable_section_slot')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Unavailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.PositiveSmallIntegerField()),
+                ('period', models.PositiveSmallIntegerField()),
+                ('note', models.CharField(blank=True, default='', max_length=120)),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='unavailability', to='core.section')),
+                ('teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='unavailability', to='core.teacher')),
+            ],
+            options={
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('section__isnull', True), ('teacher__isnull', False)), models.Q(('section__isnull', False), ('teacher__isnull', True)), _connector='OR'), name='unavailability_teacher_xor_section')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+"""Trigram GIN index for student typeahead search (PostgreSQL only; see core.search)."""
+from django.db import migrations
+
+# Must match core.search.SEARCH_EXPRESSION, or the planner will not use the index.
+SEARCH_EXPRESSION = "lower(first_name || ' ' || last_name || ' ' || admission_no)"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            # Server built without contrib: search falls back to the in-process index.
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS student_search_trgm_idx ON core_student USING gin (({SEARCH_EXPRESSION}) gin_trgm_ops)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS student_search_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_timetable"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
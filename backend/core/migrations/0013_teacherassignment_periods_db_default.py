@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_student_search_trgm'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='teacherassignment',
+            name='periods_per_week',
+            field=models.PositiveSmallIntegerField(db_default=1, default=1),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_teacherassignment_periods_db_default'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attendancesession',
+            name='attsession_section_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='attendancesession',
+            name='attsession_school_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='payment',
+            name='payment_student_paid_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='payment',
+            name='payment_paid_on_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='payment',
+            name='payment_school_paid_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_school_lastname_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='termresult',
+            name='core_termre_term_id_cab7fa_idx',
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['section', 'session_date', 'id'], name='attsession_section_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancesession',
+            index=models.Index(fields=['school', 'session_date', 'id'], name='attsession_school_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['school', 'enrolled_on', 'id'], name='enrollment_school_enrolled_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['school', 'issued_on', 'id'], name='invoice_school_issued_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['student', 'paid_on', 'id'], name='payment_student_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['school', 'paid_on', 'id'], name='payment_school_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['paid_on', 'id'], name='payment_paid_on_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school', 'last_name', 'id'], name='student_school_lastname_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='termresult',
+            index=models.Index(fields=['term', 'section', 'subject', 'rank', 'id'], name='core_termre_term_id_9a98f6_idx'),
+        ),
+    ]
@@ -10,6 +10,14 @@ class School(models.Model):
     def __str__(self):
         return self.name
 
+class TenantQuerySet(models.QuerySet):
+    """Default manager queryset for tables that carry a denormalized `school_id`."""
+    def for_school(self, school):
+        """Rows of one school (a School or its id); unscoped when `school` is None."""
+        if school is None:
+            return self
+        return self.filter(school_id=getattr(school, "pk", school))
+
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -64,6 +72,7 @@ class Student(models.Model):
 
     class Meta:
         unique_together = [("school", "admission_no")]
+        indexes = [models.Index(fields=["school", "last_name", "id"], name="student_school_lastname_idx")]
 
     def __str__(self):
         return f"{self.admission_no} - {self.first_name} {self.last_name}"
@@ -144,9 +153,18 @@ class Enrollment(models.Model):
     section = models.ForeignKey(Section, on_delete=models.RESTRICT, related_name="enrollments")
     enrolled_on = models.DateField(default=timezone.now)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.ACTIVE)
+    # Copied from student.school (core.signals) so tenant filters need no join.
+    school = models.ForeignKey(School, on_delete=models.CASCADE, editable=False, db_index=False, related_name="+")
+
+    objects = TenantQuerySet.as_manager()
 
     class Meta:
         unique_together = [("student", "academic_year")]
+        indexes = [
+            models.Index(fields=["academic_year", "section", "status"], name="enrollment_year_section_idx"),
+            models.Index(fields=["school", "academic_year", "status"], name="enrollment_school_year_idx"),
+            models.Index(fields=["school", "enrolled_on", "id"], name="enrollment_school_enrolled_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student} -> {self.section} ({self.academic_year})"
@@ -156,21 +174,85 @@ class TeacherAssignment(models.Model):
     term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name="teacher_assignments")
     section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name="teacher_assignments")
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="teacher_assignments")
+    # Lessons per week on the timetable (core.timetable); 0 leaves it off the timetable.
+    periods_per_week = models.PositiveSmallIntegerField(default=1, db_default=1)
 
     class Meta:
         unique_together = [("teacher", "term", "section", "subject")]
+        indexes = [models.Index(fields=["term", "section"], name="assignment_term_section_idx")]
 
     def __str__(self):
         return f"{self.teacher} {self.subject} {self.section} {self.term}"
 
+class Unavailability(models.Model):
+    """A weekly slot (day, period) in which a teacher or a section cannot be timetabled."""
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, null=True, blank=True, related_name="unavailability")
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, null=True, blank=True, related_name="unavailability")
+    day = models.PositiveSmallIntegerField()  # 0 = first school day of the week
+    period = models.PositiveSmallIntegerField()  # 0 = first period of the day
+    note = models.CharField(max_length=120, blank=True, default="")
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(teacher__isnull=False, section__isnull=True) | models.Q(teacher__isnull=True, section__isnull=False),
+                name="unavailability_teacher_xor_section",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.teacher or self.section} unavailable day {self.day} period {self.period}"
+
+class Timetable(models.Model):
+    """Weekly timetable of a term, built by core.timetable from its TeacherAssignments."""
+    term = models.OneToOneField(Term, on_delete=models.CASCADE, related_name="timetable")
+    days = models.PositiveSmallIntegerField(default=5)
+    periods_per_day = models.PositiveSmallIntegerField(default=8)
+    unplaced = models.PositiveIntegerField(default=0)  # lessons the solver could not fit
+    stats = models.JSONField(default=dict, blank=True)
+    generated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Timetable {self.term}"
+
+class TimetableEntry(models.Model):
+    """One lesson: an assignment taught in a (day, period) slot.
+
+    Teacher and section are copied from the assignment so the database itself
+    rejects double-booking.
+    """
+    timetable = models.ForeignKey(Timetable, on_delete=models.CASCADE, related_name="entries")
+    assignment = models.ForeignKey(TeacherAssignment, on_delete=models.CASCADE, related_name="timetable_entries")
+    teacher = models.ForeignKey(Teacher, on_delete=models.CASCADE, editable=False, related_name="+")
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, editable=False, related_name="+")
+    day = models.PositiveSmallIntegerField()
+    period = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["timetable", "teacher", "day", "period"], name="timetable_teacher_slot"),
+            models.UniqueConstraint(fields=["timetable", "section", "day", "period"], name="timetable_section_slot"),
+        ]
+
+    def __str__(self):
+        return f"{self.assignment} day {self.day} period {self.period}"
+
 class AttendanceSession(models.Model):
     term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name="attendance_sessions")
     section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name="attendance_sessions")
     session_date = models.DateField()
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="created_attendance_sessions")
+    # Copied from section.grade.school (core.signals).
+    school = models.ForeignKey(School, on_delete=models.CASCADE, editable=False, db_index=False, related_name="+")
+
+    objects = TenantQuerySet.as_manager()
 
     class Meta:
         unique_together = [("term", "section", "session_date")]
+        indexes = [
+            models.Index(fields=["section", "session_date", "id"], name="attsession_section_date_idx"),
+            models.Index(fields=["school", "session_date", "id"], name="attsession_school_date_idx"),
+        ]
 
 class AttendanceRecord(models.Model):
     class Status(models.TextChoices):
@@ -182,9 +264,21 @@ class AttendanceRecord(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="attendance_records")
     status = models.CharField(max_length=20, choices=Status.choices)
     note = models.TextField(null=True, blank=True)
+    # Copied from session.term (core.signals); the PostgreSQL partition key, see core.partitions.
+    academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, editable=False, related_name="+")
+    # Copied from student.school (core.signals).
+    school = models.ForeignKey(School, on_delete=models.CASCADE, editable=False, db_index=False, related_name="+")
+
+    objects = TenantQuerySet.as_manager()
 
     class Meta:
-        unique_together = [("session", "student")]
+        # Partitioned tables need the partition key in every unique constraint;
+        # academic_year follows from session, so this is still one row per (session, student).
+        unique_together = [("session", "student", "academic_year")]
+        indexes = [
+            models.Index(fields=["student", "session"], name="attrecord_student_session_idx"),
+            models.Index(fields=["school", "id"], name="attrecord_school_id_idx"),
+        ]
 
 class Assessment(models.Model):
     term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name="assessments")
@@ -194,15 +288,28 @@ class Assessment(models.Model):
     max_score = models.DecimalField(max_digits=6, decimal_places=2)
     weight = models.DecimalField(max_digits=6, decimal_places=2, default=1.0)
 
+    class Meta:
+        indexes = [models.Index(fields=["term", "section", "subject"], name="assessment_term_section_idx")]
+
 class AssessmentScore(models.Model):
     assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name="scores")
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="assessment_scores")
     score = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
     graded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="graded_scores")
     graded_at = models.DateTimeField(default=timezone.now)
+    # Copied from assessment.term (core.signals); the PostgreSQL partition key, see core.partitions.
+    academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, editable=False, related_name="+")
+    # Copied from student.school (core.signals).
+    school = models.ForeignKey(School, on_delete=models.CASCADE, editable=False, db_index=False, related_name="+")
+
+    objects = TenantQuerySet.as_manager()
 
     class Meta:
-        unique_together = [("assessment", "student")]
+        unique_together = [("assessment", "student", "academic_year")]
+        indexes = [
+            models.Index(fields=["student", "assessment"], name="score_student_assessment_idx"),
+            models.Index(fields=["school", "id"], name="score_school_id_idx"),
+        ]
 
 class FeeHead(models.Model):
     school = models.ForeignKey(School, on_delete=models.CASCADE, related_name="fee_heads")
@@ -229,9 +336,27 @@ class Invoice(models.Model):
 
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="invoices")
     academic_year = models.ForeignKey(AcademicYear, on_delete=models.CASCADE, related_name="invoices")
+    fee_structure = models.ForeignKey(FeeStructure, on_delete=models.SET_NULL, null=True, blank=True, related_name="invoices")
     issued_on = models.DateField(default=timezone.now)
     due_on = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.UNPAID)
+    # Maintained incrementally from items and allocations (core.billing); rebuild with reconcile_invoices.
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    school = models.ForeignKey(School, on_delete=models.CASCADE, editable=False, db_index=False, related_name="+")
+
+    objects = TenantQuerySet.as_manager()
+
+    class Meta:
+        unique_together = [("student", "fee_structure")]
+        indexes = [
+            models.Index(fields=["student", "due_on"], condition=models.Q(balance__gt=0), name="invoice_outstanding_idx"),
+            models.Index(fields=["student", "status", "due_on"], name="invoice_student_status_idx"),
+            models.Index(fields=["status", "due_on"], name="invoice_status_due_idx"),
+            models.Index(fields=["school", "status", "due_on"], name="invoice_school_status_idx"),
+            models.Index(fields=["school", "issued_on", "id"], name="invoice_school_issued_idx"),
+        ]
 
 class InvoiceItem(models.Model):
     invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name="items")
@@ -244,6 +369,16 @@ class Payment(models.Model):
     method = models.CharField(max_length=30)  # CASH/BANK/MOBILE
     reference = models.CharField(max_length=120, null=True, blank=True)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
+    school = models.ForeignKey(School, on_delete=models.CASCADE, editable=False, db_index=False, related_name="+")
+
+    objects = TenantQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["student", "paid_on", "id"], name="payment_student_paid_idx"),
+            models.Index(fields=["school", "paid_on", "id"], name="payment_school_paid_idx"),
+            models.Index(fields=["paid_on", "id"], name="payment_paid_on_idx"),
+        ]
 
 class PaymentAllocation(models.Model):
     payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name="allocations")
@@ -252,3 +387,85 @@ class PaymentAllocation(models.Model):
 
     class Meta:
         unique_together = [("payment", "invoice")]
+
+class TermResult(models.Model):
+    """Materialized weighted term mark for a student (subject NULL = overall mark).
+
+    Maintained by core.gradebook; never written by clients.
+    """
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name="results")
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name="term_results")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, null=True, blank=True, related_name="term_results")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="term_results")
+    percentage = models.DecimalField(max_digits=6, decimal_places=2)
+    rank = models.PositiveIntegerField()
+    percentile = models.DecimalField(max_digits=5, decimal_places=2)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["term", "section", "subject", "student"],
+                condition=models.Q(subject__isnull=False),
+                name="uniq_term_result_subject",
+            ),
+            models.UniqueConstraint(
+                fields=["term", "section", "student"],
+                condition=models.Q(subject__isnull=True),
+                name="uniq_term_result_overall",
+            ),
+        ]
+        indexes = [models.Index(fields=["term", "section", "subject", "rank", "id"])]
+
+class SyncChange(models.Model):
+    """Append-only change log for offline clients; `seq` is the sync cursor.
+
+    One row per write to a synced model (see core.sync), deletes included as
+    tombstones. Scope columns are copied at write time and deliberately not
+    enforced as foreign keys, so tombstones outlive the rows they describe.
+    """
+    seq = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=40)
+    object_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    school = models.ForeignKey(School, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name="+")
+    section = models.ForeignKey(Section, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name="+")
+    student = models.ForeignKey(Student, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name="+")
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["school", "seq"], name="syncchange_school_seq_idx"),
+            models.Index(fields=["section", "seq"], name="syncchange_section_seq_idx"),
+            models.Index(fields=["student", "seq"], name="syncchange_student_seq_idx"),
+        ]
+
+class Job(models.Model):
+    """Background job run by `manage.py run_worker` (see core.jobs)."""
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        SUCCEEDED = "SUCCEEDED", "Succeeded"
+        FAILED = "FAILED", "Failed"
+
+    name = models.CharField(max_length=80)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=120, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="jobs")
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"], name="job_claim_idx")]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,74 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+class KeysetPagination(CursorPagination):
+    """Cursor (keyset) pagination on the primary key.
+
+    Pages are fetched with `WHERE id < last_seen ORDER BY id DESC LIMIT n`, so
+    deep pages cost the same as the first one. Other orderings come from
+    KeysetOrderingFilter as (column, id); their cursor holds both values and
+    pages with `WHERE column < v OR (column = v AND id < last_id)`.
+    """
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    # Set while DRF pages a queryset whose (column, id) keyset is already applied.
+    _applied_cursor = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(request, queryset, view)
+        cursor = self.decode_cursor(request)
+        if len(ordering) < 2 or cursor is None or cursor.position is None:
+            return super().paginate_queryset(queryset, request, view)
+        # DRF only filters on ordering[0]: apply the (column, id) keyset here and
+        # let it page from the start of what is left, then restore the cursor.
+        try:
+            queryset = queryset.filter(self._after(ordering, cursor))
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        self._applied_cursor = cursor
+        try:
+            page = super().paginate_queryset(queryset, request, view)
+        finally:
+            self._applied_cursor = None
+        self.cursor = cursor
+        if cursor.reverse:
+            self.has_next, self.next_position = True, cursor.position
+        else:
+            self.has_previous, self.previous_position = True, cursor.position
+        self.display_page_controls = self.template is not None
+        return page
+
+    def decode_cursor(self, request):
+        if self._applied_cursor is not None:
+            return self._applied_cursor._replace(position=None, offset=0)
+        return super().decode_cursor(request)
+
+    def _after(self, ordering, cursor):
+        pk, sep, value = cursor.position.partition(":")
+        if not sep or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        field = ordering[0].lstrip("-")
+        op = "lt" if ordering[0].startswith("-") != cursor.reverse else "gt"
+        return Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": pk})
+
+    def _get_position_from_instance(self, instance, ordering):
+        value = super()._get_position_from_instance(instance, ordering)
+        if len(ordering) < 2:
+            return value
+        pk = instance["id"] if isinstance(instance, dict) else instance.pk
+        return f"{pk}:{value}"
+
+class ReferencePagination(KeysetPagination):
+    """Small, rarely-changing lookup tables: larger pages, oldest first."""
+    ordering = "id"
+    page_size = 100
+    max_page_size = 500
+
+class LedgerPagination(KeysetPagination):
+    """High-volume tables (attendance, scores, invoice lines, allocations)."""
+    page_size = 100
+    max_page_size = 1000
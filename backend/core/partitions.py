@@ -0,0 +1,152 @@
+"""PostgreSQL LIST partitioning of attendance records and assessment scores by academic year.
+
+Each table is partitioned on its `academic_year_id` column: one partition per
+year (`<table>_y<id>`) plus a default partition. Queries filtered to a year
+(or to sessions/assessments of one term, via the indexes) touch only that
+year's partition, and closed years can be detached into the `archive` schema
+(`manage.py archive_partitions`) so the live table only holds current data.
+
+On other databases the tables stay plain and everything here is a no-op,
+apart from the academic-year lookups used to fill the column.
+"""
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from . import analytics, caching
+from .models import Assessment, AssessmentScore, AttendanceRecord, Term
+
+PARTITIONED_TABLES = (AttendanceRecord._meta.db_table, AssessmentScore._meta.db_table)
+PARTITION_KEY = "academic_year_id"
+ARCHIVE_SCHEMA = "archive"
+
+def year_of_term(term_id):
+    key = f"term-year:{caching.generation()}:{term_id}"
+    year_id = cache.get(key)
+    if year_id is None:
+        year_id = Term.objects.filter(pk=term_id).values_list("academic_year_id", flat=True).first()
+        cache.set(key, year_id, None)
+    return year_id
+
+def year_of_session(session_id):
+    scope = analytics.session_scope(session_id)
+    return scope and year_of_term(scope[0])
+
+def year_of_assessment(assessment_id):
+    return Assessment.objects.filter(pk=assessment_id).values_list("term__academic_year_id", flat=True).first()
+
+def supported(using=connection):
+    return using.vendor == "postgresql"
+
+def partition_name(table, year_id):
+    return f"{table}_y{year_id}"
+
+def _q(name):
+    return connection.ops.quote_name(name)
+
+def is_partitioned(cursor, table):
+    cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table])
+    return cursor.fetchone() is not None
+
+def _table_exists(cursor, name, schema="public"):
+    cursor.execute("SELECT to_regclass(%s)", [f"{schema}.{name}"])
+    return cursor.fetchone()[0] is not None
+
+@transaction.atomic
+def ensure_partition(year_id):
+    """Give `year_id` its own partition in each table, moving any rows it already has in the default partition."""
+    if not supported():
+        return
+    with connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, year_id)
+            if not is_partitioned(cursor, table) or _table_exists(cursor, name):
+                continue
+            cursor.execute(f"CREATE TABLE {_q(name)} (LIKE {_q(table)} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {_q(table + '_default')} WHERE {PARTITION_KEY} = %s RETURNING *) "
+                f"INSERT INTO {_q(name)} SELECT * FROM moved",
+                [year_id],
+            )
+            cursor.execute(f"ALTER TABLE {_q(table)} ATTACH PARTITION {_q(name)} FOR VALUES IN (%s)" % int(year_id))
+
+def _columns(cursor, schema, table):
+    cursor.execute(
+        """
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped
+        ORDER BY a.attnum
+        """,
+        [f"{schema}.{table}"],
+    )
+    return cursor.fetchall()
+
+def _archive_view(cursor, table):
+    """Recreate archive.<table>_all: live rows plus every archived partition, for reporting.
+
+    Columns added to the live table after a year was archived read as NULL for that year.
+    """
+    live = _columns(cursor, "public", table)
+    cursor.execute(
+        "SELECT tablename FROM pg_tables WHERE schemaname = %s AND tablename LIKE %s ORDER BY tablename",
+        [ARCHIVE_SCHEMA, f"{table}\\_y%"],
+    )
+    selects = [f"SELECT * FROM public.{_q(table)}"]
+    for (name,) in cursor.fetchall():
+        present = {column for column, _ in _columns(cursor, ARCHIVE_SCHEMA, name)}
+        select_list = ", ".join(_q(c) if c in present else f"NULL::{kind} AS {_q(c)}" for c, kind in live)
+        selects.append(f"SELECT {select_list} FROM {ARCHIVE_SCHEMA}.{_q(name)}")
+    cursor.execute(f"DROP VIEW IF EXISTS {ARCHIVE_SCHEMA}.{_q(table + '_all')}")
+    cursor.execute(f"CREATE VIEW {ARCHIVE_SCHEMA}.{_q(table + '_all')} AS " + " UNION ALL ".join(selects))
+
+@transaction.atomic
+def archive_year(year_id):
+    """Detach a year's partitions into the archive schema; returns {table: rows archived}."""
+    archived = {}
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}")
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, year_id)
+            if not _table_exists(cursor, name):
+                continue
+            cursor.execute(f"ALTER TABLE {_q(table)} DETACH PARTITION {_q(name)}")
+            # Frozen history: drop foreign keys so deleting a student or year isn't blocked by archived rows.
+            cursor.execute("SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'", [name])
+            for (constraint,) in cursor.fetchall():
+                cursor.execute(f"ALTER TABLE {_q(name)} DROP CONSTRAINT {_q(constraint)}")
+            cursor.execute(f"ALTER TABLE {_q(name)} SET SCHEMA {ARCHIVE_SCHEMA}")
+            cursor.execute(f"SELECT COUNT(*) FROM {ARCHIVE_SCHEMA}.{_q(name)}")
+            archived[table] = cursor.fetchone()[0]
+            _archive_view(cursor, table)
+    return archived
+
+@transaction.atomic
+def restore_year(year_id):
+    """Reattach archived partitions of a year (the parent's foreign keys are re-applied and validated)."""
+    restored = {}
+    with connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            name = partition_name(table, year_id)
+            if not _table_exists(cursor, name, ARCHIVE_SCHEMA):
+                continue
+            present = {column for column, _ in _columns(cursor, ARCHIVE_SCHEMA, name)}
+            for column, kind in _columns(cursor, "public", table):
+                if column not in present:
+                    # Added since archiving; NOT NULL columns must be backfilled before the attach below succeeds.
+                    cursor.execute(f"ALTER TABLE {ARCHIVE_SCHEMA}.{_q(name)} ADD COLUMN {_q(column)} {kind}")
+            cursor.execute(f"ALTER TABLE {ARCHIVE_SCHEMA}.{_q(name)} SET SCHEMA public")
+            cursor.execute(f"ALTER TABLE {_q(table)} ATTACH PARTITION {_q(name)} FOR VALUES IN (%s)" % int(year_id))
+            cursor.execute(f"SELECT COUNT(*) FROM {_q(name)}")
+            restored[table] = cursor.fetchone()[0]
+            _archive_view(cursor, table)
+    return restored
+
+def archived_years():
+    if not supported():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT DISTINCT substring(tablename from '_y([0-9]+)$')::int FROM pg_tables WHERE schemaname = %s AND tablename LIKE %s",
+            [ARCHIVE_SCHEMA, f"{PARTITIONED_TABLES[0]}\\_y%"],
+        )
+        return sorted(row[0] for row in cursor.fetchall())
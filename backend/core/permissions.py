@@ -1,10 +1,63 @@
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.permissions import BasePermission, SAFE_METHODS
-from .models import User, TeacherAssignment, Enrollment
+from .models import User, TeacherAssignment, Enrollment, AttendanceRecord, AssessmentScore
+
+def _scope_cache_key(teacher_id):
+    return f"teacher-scopes:{teacher_id}"
+
+def teacher_scopes(teacher_id):
+    """(term, section, subject) id triples a teacher is assigned to.
+
+    Cached across requests until a TeacherAssignment for the teacher changes
+    (see core.signals), bounded by TEACHER_SCOPE_CACHE_TIMEOUT for caches that
+    are local to one worker process.
+    """
+    key = _scope_cache_key(teacher_id)
+    scopes = cache.get(key)
+    if scopes is None:
+        scopes = frozenset(
+            TeacherAssignment.objects.filter(teacher_id=teacher_id).values_list("term_id", "section_id", "subject_id")
+        )
+        cache.set(key, scopes, getattr(settings, "TEACHER_SCOPE_CACHE_TIMEOUT", 300))
+    return scopes
+
+def invalidate_teacher_scopes(teacher_id):
+    cache.delete(_scope_cache_key(teacher_id))
+
+def _request_scopes(request, teacher_id):
+    """Per-request memo so list/bulk checks resolve scopes once."""
+    scopes = getattr(request, "_teacher_scopes", None)
+    if scopes is None:
+        triples = teacher_scopes(teacher_id)
+        scopes = (triples, frozenset((term, section) for term, section, _ in triples))
+        request._teacher_scopes = scopes
+    return scopes
+
+def _object_scope(obj):
+    """FK ids (term, section, subject) for sessions, records, assessments and scores."""
+    if isinstance(obj, AttendanceRecord):
+        obj = obj.session
+    elif isinstance(obj, AssessmentScore):
+        obj = obj.assessment
+    return obj.term_id, obj.section_id, getattr(obj, "subject_id", None)
 
 class IsAdminLike(BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role in {User.Role.ADMIN}
 
+class IsStaffRole(BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.role != User.Role.STUDENT
+
+class IsFinanceLike(BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.role in {User.Role.ADMIN, User.Role.FINANCE}
+
+class IsRegistrarLike(BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.role in {User.Role.ADMIN, User.Role.REGISTRAR}
+
 class AdminRegistrarFinanceTeacherReadOnly(BasePermission):
     """Admins full, staff roles read, students read-only for own via view filtering."""
     def has_permission(self, request, view):
@@ -36,13 +89,11 @@ class TeacherCanModifyAssigned(BasePermission):
         if not teacher:
             return False
         # obj may be AttendanceSession/Record or Assessment/Score
-        term = getattr(obj, "term", None) or getattr(getattr(obj, "session", None), "term", None) or getattr(getattr(obj, "assessment", None), "term", None)
-        section = getattr(obj, "section", None) or getattr(getattr(obj, "session", None), "section", None) or getattr(getattr(obj, "assessment", None), "section", None)
-        subject = getattr(obj, "subject", None) or getattr(getattr(obj, "assessment", None), "subject", None)
-        qs = TeacherAssignment.objects.filter(teacher=teacher, term=term, section=section)
-        if subject is not None:
-            qs = qs.filter(subject=subject)
-        return qs.exists()
+        term_id, section_id, subject_id = _object_scope(obj)
+        triples, pairs = _request_scopes(request, teacher.id)
+        if subject_id is None:
+            return (term_id, section_id) in pairs
+        return (term_id, section_id, subject_id) in triples
 
 class StudentOwnDataOnly(BasePermission):
     """Students can only access their own related objects."""
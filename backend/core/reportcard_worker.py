@@ -0,0 +1,23 @@
+"""Report card rendering run inside pool processes.
+
+Kept free of model imports: spawned workers import this module before
+init_worker() has set Django up.
+"""
+from django.template.loader import render_to_string
+from django.utils.text import slugify
+
+def init_worker():
+    import django
+    django.setup()
+
+def filename(card, fmt):
+    folder = slugify(f"{card['grade']} {card['section']}")
+    return f"{folder}/{slugify(card['admission_no'])}-{slugify(card['name'])}.{fmt}"
+
+def render_card(card, fmt):
+    """(zip member name, document bytes) for one card."""
+    html = render_to_string("core/report_card.html", {"card": card})
+    if fmt == "pdf":
+        from weasyprint import HTML
+        return filename(card, fmt), HTML(string=html).write_pdf()
+    return filename(card, fmt), html.encode()
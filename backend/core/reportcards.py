@@ -0,0 +1,117 @@
+"""Batch report cards for a section or a whole grade.
+
+Data for every enrolled student is read with a handful of bulk queries (one
+each for enrollments, scores and term results, plus the cached per-section
+attendance rates) into plain dicts, which are then rendered to HTML or PDF in
+a process pool and written into a zip on disk.
+"""
+import os
+import tempfile
+import zipfile
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import analytics
+from .models import AssessmentScore, Enrollment, TermResult
+from .reportcard_worker import init_worker, render_card
+
+FORMATS = {"html": zipfile.ZIP_DEFLATED, "pdf": zipfile.ZIP_STORED}
+
+def pdf_available():
+    try:
+        import weasyprint  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def collect(term, section_ids):
+    """One card dict per active enrollment in `section_ids`, ordered by section then name."""
+    enrollments = (
+        Enrollment.objects
+        .filter(academic_year_id=term.academic_year_id, section_id__in=section_ids, status=Enrollment.Status.ACTIVE)
+        .select_related("student", "section__grade", "academic_year__school")
+        .order_by("section__grade__sort_order", "section__name", "student__last_name", "student__first_name", "student_id")
+    )
+    assessments = defaultdict(lambda: defaultdict(list))
+    for row in (
+        AssessmentScore.objects
+        .filter(assessment__term_id=term.id, assessment__section_id__in=section_ids)
+        .values("student_id", "assessment__subject_id", "assessment__name", "assessment__max_score", "score")
+        .order_by("assessment__subject_id", "assessment_id")
+    ):
+        assessments[row["student_id"]][row["assessment__subject_id"]].append({
+            "name": row["assessment__name"], "score": row["score"], "max_score": row["assessment__max_score"],
+        })
+
+    results = defaultdict(dict)
+    class_sizes = Counter()
+    for row in (
+        TermResult.objects
+        .filter(term_id=term.id, section_id__in=section_ids)
+        .values("section_id", "student_id", "subject_id", "subject__name", "percentage", "rank", "percentile")
+        .order_by("subject__name")
+    ):
+        results[row["student_id"]][row["subject_id"]] = row
+        class_sizes[row["section_id"], row["subject_id"]] += 1
+
+    attendance = {}
+    for section_id in section_ids:
+        for row in analytics.student_rates(term.id, section_id):
+            attendance[row["student_id"]] = row
+
+    cards = []
+    for e in enrollments:
+        student, section = e.student, e.section
+        own = results.get(student.id, {})
+        subjects = [
+            {
+                "name": r["subject__name"],
+                "percentage": r["percentage"],
+                "rank": r["rank"],
+                "class_size": class_sizes[section.id, subject_id],
+                "assessments": assessments[student.id].get(subject_id, []),
+            }
+            for subject_id, r in own.items() if subject_id is not None
+        ]
+        overall = own.get(None)
+        cards.append({
+            "school": e.academic_year.school.name,
+            "academic_year": e.academic_year.name,
+            "term": term.name,
+            "grade": section.grade.name,
+            "section": section.name,
+            "admission_no": student.admission_no,
+            "name": f"{student.first_name} {student.last_name}",
+            "subjects": subjects,
+            "overall": overall and {**overall, "class_size": class_sizes[section.id, None]},
+            "attendance": attendance.get(student.id),
+            "generated_on": timezone.localdate(),
+        })
+    return cards
+
+def _rendered(cards, fmt, workers):
+    if workers <= 1 or len(cards) < getattr(settings, "REPORT_CARD_POOL_MIN", 50):
+        return map(render_card, cards, repeat(fmt))
+    # spawn, not fork: the parent may hold database connections and threads.
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"), initializer=init_worker)
+    chunksize = max(1, len(cards) // (workers * 4))
+    return _shutdown_after(pool, pool.map(render_card, cards, repeat(fmt), chunksize=chunksize))
+
+def _shutdown_after(pool, results):
+    with pool:
+        yield from results
+
+def build_zip(cards, fmt="html", workers=None):
+    """Render `cards` into a zip in a temporary file, rewound and ready to stream."""
+    workers = workers or getattr(settings, "REPORT_CARD_WORKERS", 0) or os.cpu_count() or 1
+    out = tempfile.TemporaryFile()
+    with zipfile.ZipFile(out, "w", FORMATS[fmt]) as archive:
+        for name, content in _rendered(cards, fmt, workers):
+            archive.writestr(name, content)
+    out.seek(0)
+    return out
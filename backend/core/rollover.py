@@ -0,0 +1,209 @@
+"""Academic year rollover: promote a school's ACTIVE enrollments into a new year.
+
+Every student moves to the next grade by `sort_order`, into the section with the
+same name (or the grade's first section), in one INSERT ... SELECT whose target
+section is a CASE over the old section. Repeaters stay in their section, leavers
+are marked LEFT, and students in the last grade graduate (no new enrollment).
+Terms, fee structures and teacher assignments of the old year can be cloned as
+templates for the new one. A dry run returns the same diff without writing.
+"""
+from django.db import connection, transaction
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Value, When
+
+from . import caching, sync
+from .models import (
+    AcademicYear, Enrollment, FeeStructure, FeeStructureItem, Grade, Section, TeacherAssignment, Term,
+)
+from .permissions import invalidate_teacher_scopes
+
+PROMOTED, REPEATED, GRADUATED, LEFT, ENROLLED = "promoted", "repeated", "graduated", "left", "already_enrolled"
+CLONABLE = ("terms", "fee_structures", "teacher_assignments")
+
+def section_map(school_id):
+    """{section_id: next-grade section_id}; sections of the last grade are absent."""
+    sections = {}
+    for section_id, grade_id, name in Section.objects.filter(grade__school_id=school_id).order_by("name", "id").values_list("id", "grade_id", "name"):
+        sections.setdefault(grade_id, {}).setdefault(name, section_id)
+    grades = list(Grade.objects.filter(school_id=school_id).order_by("sort_order", "id").values_list("id", flat=True))
+    mapping = {}
+    for grade_id, next_grade_id in zip(grades, grades[1:]):
+        targets = sections.get(next_grade_id)
+        if not targets:
+            continue
+        fallback = next(iter(targets.values()))
+        for name, section_id in sections.get(grade_id, {}).items():
+            mapping[section_id] = targets.get(name, fallback)
+    return mapping
+
+def _outcomes(source, target_id, mapping, repeat, leave):
+    """Source ACTIVE enrollments annotated with what happens to each of them."""
+    whens = []
+    if target_id:
+        whens.append(When(Exists(Enrollment.objects.filter(student=OuterRef("student"), academic_year_id=target_id)), then=Value(ENROLLED)))
+    whens += [
+        When(student_id__in=leave, then=Value(LEFT)),
+        When(student_id__in=repeat, then=Value(REPEATED)),
+        When(section_id__in=mapping, then=Value(PROMOTED)),
+    ]
+    return (
+        Enrollment.objects.filter(academic_year=source, status=Enrollment.Status.ACTIVE)
+        .annotate(outcome=Case(*whens, default=Value(GRADUATED)))
+        .order_by()
+    )
+
+def _insert_select(model, queryset):
+    """INSERT INTO model's table the rows of `queryset`, a values() query keyed "c_<field>"."""
+    aliases = list(queryset.query.annotation_select)
+    columns = ", ".join(connection.ops.quote_name(model._meta.get_field(alias[2:]).column) for alias in aliases)
+    sql, params = queryset.query.get_compiler(connection=connection).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) {sql}", params)
+        return cursor.rowcount
+
+def _diff(outcomes, mapping, school_id):
+    labels = {
+        pk: f"{grade} {name}"
+        for pk, grade, name in Section.objects.filter(grade__school_id=school_id).values_list("pk", "grade__name", "name")
+    }
+    totals = dict.fromkeys((PROMOTED, REPEATED, GRADUATED, LEFT, ENROLLED), 0)
+    moves = []
+    for section_id, outcome, count in outcomes.values_list("section_id", "outcome").annotate(n=Count("id")).order_by("section_id", "outcome"):
+        totals[outcome] += count
+        to_section = {PROMOTED: mapping.get(section_id), REPEATED: section_id}.get(outcome)
+        moves.append({
+            "from_section": section_id, "from": labels.get(section_id, str(section_id)), "outcome": outcome,
+            "to_section": to_section, "to": labels.get(to_section), "students": count,
+        })
+    return totals, moves
+
+def _clone_terms(source, target):
+    existing = set(target.terms.values_list("name", flat=True))
+    shift = target.starts_on - source.starts_on
+    terms = [
+        Term(academic_year=target, name=term.name, starts_on=term.starts_on + shift, ends_on=term.ends_on + shift)
+        for term in source.terms.order_by("starts_on", "id") if term.name not in existing
+    ]
+    Term.objects.bulk_create(terms)
+    return len(terms)
+
+def _clone_fee_structures(source, target):
+    existing = set(target.fee_structures.values_list("grade_id", "name"))
+    structures = [
+        FeeStructure(academic_year=target, grade_id=grade_id, name=name)
+        for grade_id, name in source.fee_structures.order_by("id").values_list("grade_id", "name")
+        if (grade_id, name) not in existing
+    ]
+    FeeStructure.objects.bulk_create(structures)
+    if not structures:
+        return 0
+    new_ids = {(s.grade_id, s.name): s.pk for s in target.fee_structures.all()}
+    old_to_new = {
+        pk: new_ids[(grade_id, name)]
+        for pk, grade_id, name in source.fee_structures.values_list("pk", "grade_id", "name")
+        if (grade_id, name) not in existing
+    }
+    _insert_select(FeeStructureItem, FeeStructureItem.objects.filter(fee_structure_id__in=old_to_new).order_by().values(
+        c_fee_structure=Case(*[When(fee_structure_id=old, then=Value(new)) for old, new in old_to_new.items()], output_field=IntegerField()),
+        c_fee_head=F("fee_head_id"),
+        c_amount=F("amount"),
+    ))
+    return len(structures)
+
+def _clone_teacher_assignments(source, target):
+    target_terms = dict(target.terms.values_list("name", "pk"))
+    term_map = {pk: target_terms[name] for pk, name in source.terms.values_list("pk", "name") if name in target_terms}
+    if not term_map:
+        return 0
+    new_term = Case(*[When(term_id=old, then=Value(new)) for old, new in term_map.items()], output_field=IntegerField())
+    assignments = (
+        TeacherAssignment.objects.filter(term_id__in=term_map)
+        .annotate(new_term=new_term)
+        .exclude(Exists(TeacherAssignment.objects.filter(
+            teacher=OuterRef("teacher"), term_id=OuterRef("new_term"), section=OuterRef("section"), subject=OuterRef("subject"),
+        )))
+        .order_by()
+    )
+    teachers = set(assignments.values_list("teacher_id", flat=True))
+    created = _insert_select(TeacherAssignment, assignments.values(
+        c_teacher=F("teacher_id"), c_term=F("new_term"), c_section=F("section_id"), c_subject=F("subject_id"),
+        c_periods_per_week=F("periods_per_week"),
+    ))
+    for teacher_id in teachers:
+        invalidate_teacher_scopes(teacher_id)
+    return created
+
+def rollover(source, target=None, name=None, starts_on=None, ends_on=None, repeat=(), leave=(),
+             clone=CLONABLE, activate=False, dry_run=False, progress=None):
+    """Roll `source` (an AcademicYear) over into `target`, or into a new year built from name/dates.
+
+    Students already enrolled in the target year are left alone, so a rollover
+    can be re-run after fixing a few records. Returns the diff: per-section
+    moves and totals, plus how many templates were (or would be) cloned.
+    """
+    unknown = set(clone) - set(CLONABLE)
+    if unknown:
+        raise ValueError(f"Cannot clone {', '.join(sorted(unknown))}; choose from {', '.join(CLONABLE)}.")
+    repeat, leave = set(repeat), set(leave)
+    mapping = section_map(source.school_id)
+    result = {"source": source.pk, "target": target.pk if target else None, "dry_run": dry_run}
+
+    if dry_run:
+        totals, moves = _diff(_outcomes(source, result["target"], mapping, repeat, leave), mapping, source.school_id)
+        # Upper bounds: rows that already exist in the target year are skipped on the real run.
+        counts = {
+            "terms": source.terms.count(),
+            "fee_structures": source.fee_structures.count(),
+            "teacher_assignments": TeacherAssignment.objects.filter(term__academic_year=source).count(),
+        }
+        return {**result, **totals, "moves": moves, "cloned": {k: v for k, v in counts.items() if k in clone}}
+
+    with transaction.atomic():
+        if target is None:
+            # create(), not bulk: the post_save signal adds the year's partitions.
+            target = AcademicYear.objects.create(school_id=source.school_id, name=name, starts_on=starts_on, ends_on=ends_on)
+            result["target"] = target.pk
+        outcomes = _outcomes(source, target.pk, mapping, repeat, leave)
+        totals, moves = _diff(outcomes, mapping, source.school_id)
+        # From the same outcomes as the diff: a leaver already enrolled in the target is left alone.
+        left_ids = list(outcomes.filter(outcome=LEFT).values_list("id", flat=True))
+        if progress:
+            progress(1, 4)
+
+        last_id = Enrollment.objects.filter(academic_year=target).order_by("-id").values_list("id", flat=True).first() or 0
+        new_section = Case(
+            When(outcome=REPEATED, then=F("section_id")),
+            *[When(section_id=old, then=Value(new)) for old, new in mapping.items()],
+            output_field=IntegerField(),
+        )
+        _insert_select(Enrollment, outcomes.filter(outcome__in=[PROMOTED, REPEATED]).values(
+            c_student=F("student_id"),
+            c_academic_year=Value(target.pk),
+            c_section=new_section,
+            c_enrolled_on=Value(target.starts_on),
+            c_status=Value(Enrollment.Status.ACTIVE),
+            c_school=F("school_id"),
+        ))
+        sync.record_changes(Enrollment.objects.filter(academic_year=target, id__gt=last_id))
+        if progress:
+            progress(2, 4)
+
+        Enrollment.objects.filter(id__in=left_ids).update(status=Enrollment.Status.LEFT)
+        sync.record_changes(Enrollment.objects.filter(id__in=left_ids))
+        if progress:
+            progress(3, 4)
+
+        cloned = {}
+        if "terms" in clone:
+            cloned["terms"] = _clone_terms(source, target)
+        if "fee_structures" in clone:
+            cloned["fee_structures"] = _clone_fee_structures(source, target)
+        if "teacher_assignments" in clone:
+            cloned["teacher_assignments"] = _clone_teacher_assignments(source, target)
+        if activate:
+            AcademicYear.objects.filter(school_id=source.school_id).exclude(pk=target.pk).update(is_active=False)
+            AcademicYear.objects.filter(pk=target.pk).update(is_active=True)
+        # Bulk writes skip the reference-data signals.
+        transaction.on_commit(caching.invalidate_reference_data)
+    if progress:
+        progress(4, 4)
+    return {**result, **totals, "moves": moves, "cloned": cloned}
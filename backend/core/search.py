@@ -0,0 +1,167 @@
+"""Typeahead student search over first name, last name and admission number.
+
+On PostgreSQL with pg_trgm the lookup runs against a pg_trgm GIN index on
+SEARCH_EXPRESSION (migration 0012): every query word of three or more
+characters must appear somewhere in the name/admission number (shorter words
+must start one of them); when that finds too few rows, names are matched by
+trigram word similarity, which tolerates typos. Elsewhere (SQLite, or a server without the
+extension) each process keeps a sorted
+(word, student) list per school and answers word-prefix queries with bisect.
+The list is rebuilt, from the primary, on the next search after any student of
+the school changes (core.signals); bulk writers call invalidate() themselves.
+With a per-process cache those invalidations don't reach other processes, so
+the list is also rebuilt when the school's student count or highest id moves
+(inserts and deletes made elsewhere) and once it is STUDENT_SEARCH_INDEX_TIMEOUT
+seconds old (renames).
+
+Results are ranked: exact admission number, then rows where a word starts
+with the (first) query word, then by name; fuzzy matches come last.
+"""
+import bisect
+import heapq
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import Count, Max
+
+from .db_router import pin_primary
+from .models import Student
+
+SEARCH_EXPRESSION = "lower(first_name || ' ' || last_name || ' ' || admission_no)"
+
+_indexes = {}  # school_id -> (stamp, expires, PrefixIndex), local to this process
+_trigram = {}  # database alias -> pg_trgm installed
+
+def _words(text):
+    return [w for w in re.split(r"[\s,]+", text.lower()) if w]
+
+def _version_key(school_id):
+    return f"student-search:{school_id or 'all'}"
+
+def _version(school_id):
+    return cache.get_or_set(_version_key(school_id), 1, None)
+
+def invalidate(school_id):
+    for key in {_version_key(school_id), _version_key(None)}:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+class PrefixIndex:
+    def __init__(self, rows):
+        """rows: (id, first_name, last_name, admission_no)."""
+        self.names = {}
+        entries = []
+        for pk, first, last, admission_no in rows:
+            self.names[pk] = (last.lower(), first.lower(), admission_no.lower())
+            entries += [(word, pk) for word in {*_words(first), *_words(last), admission_no.lower()}]
+        entries.sort()
+        self.words = [word for word, _ in entries]
+        self.ids = [pk for _, pk in entries]
+
+    def _prefixed(self, prefix):
+        start = bisect.bisect_left(self.words, prefix)
+        end = bisect.bisect_left(self.words, prefix + "\uffff", start)
+        return self.ids[start:end]
+
+    def search(self, query, limit):
+        words = _words(query)
+        if not words:
+            return []
+        matches = None
+        for word in sorted(words, key=len, reverse=True):
+            found = set(self._prefixed(word))
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        query = query.strip().lower()
+
+        def rank(pk):
+            last, first, admission_no = self.names[pk]
+            exact_words = sum(w in (last, first, admission_no) for w in words)
+            return (admission_no != query, -exact_words, last, first, pk)
+
+        return heapq.nsmallest(limit, matches, key=rank)
+
+def _prefix_index(school_id):
+    pin_primary()  # don't index (or compare against) a lagging replica
+    qs = Student.objects.all()
+    if school_id:
+        qs = qs.filter(school_id=school_id)
+    stamp = (_version(school_id), *qs.aggregate(n=Count("id"), last=Max("id")).values())
+    cached = _indexes.get(school_id)
+    if cached and cached[0] == stamp and time.monotonic() < cached[1]:
+        return cached[2]
+    index = PrefixIndex(qs.values_list("id", "first_name", "last_name", "admission_no").iterator(chunk_size=5000))
+    _indexes[school_id] = (stamp, time.monotonic() + getattr(settings, "STUDENT_SEARCH_INDEX_TIMEOUT", 60), index)
+    return index
+
+def _escape(word):
+    return re.sub(r"([\\%_])", r"\\\1", word)
+
+def _trigram_search(alias, school_id, query, limit):
+    words = _words(query)
+    if not words:
+        return []
+    school, school_params = ("school_id = %s AND ", [school_id]) if school_id else ("", [])
+    # Words of 3+ characters match anywhere (trigram index); shorter ones only match a word start.
+    conditions, params = [], []
+    for word in words:
+        if len(word) >= 3:
+            conditions.append(f"{SEARCH_EXPRESSION} LIKE %s")
+            params.append(f"%{_escape(word)}%")
+        else:
+            conditions.append("(lower(first_name) LIKE %s OR lower(last_name) LIKE %s OR lower(admission_no) LIKE %s)")
+            params += [f"{_escape(word)}%"] * 3
+    prefix = f"{_escape(words[0])}%"
+    sql = f"""
+        SELECT id FROM core_student
+        WHERE {school}{" AND ".join(conditions)}
+        ORDER BY lower(admission_no) = %s DESC,
+                 (lower(first_name) LIKE %s OR lower(last_name) LIKE %s OR lower(admission_no) LIKE %s) DESC,
+                 last_name, first_name, id
+        LIMIT %s
+    """
+    with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+        cursor.execute(sql, [*school_params, *params, " ".join(words), prefix, prefix, prefix, limit])
+        ids = [pk for pk, in cursor.fetchall()]
+        if len(ids) >= limit or any(len(w) < 3 or re.search(r"\d", w) for w in words):
+            return ids
+        # Too few hits: tolerate typos in names by word similarity (pg_trgm's <% operator).
+        similar = " AND ".join([f"%s <%% {SEARCH_EXPRESSION}"] * len(words))
+        score = " + ".join([f"word_similarity(%s, {SEARCH_EXPRESSION})"] * len(words))
+        exclude = f"AND id NOT IN ({', '.join(['%s'] * len(ids))})" if ids else ""
+        threshold = getattr(settings, "STUDENT_SEARCH_SIMILARITY", 0.3)
+        cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(threshold)])
+        cursor.execute(
+            f"SELECT id FROM core_student WHERE {school}{similar} {exclude} ORDER BY {score} DESC, last_name, first_name, id LIMIT %s",
+            [*school_params, *words, *ids, *words, limit - len(ids)],
+        )
+        return ids + [pk for pk, in cursor.fetchall()]
+
+def _has_trigram(alias):
+    if alias not in _trigram:
+        connection = connections[alias]
+        _trigram[alias] = False
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                _trigram[alias] = cursor.fetchone() is not None
+    return _trigram[alias]
+
+def search_students(query, school_id=None, limit=10):
+    """Up to `limit` Students matching `query`, best first."""
+    alias = router.db_for_read(Student) or DEFAULT_DB_ALIAS
+    if _has_trigram(alias):
+        ids = _trigram_search(alias, school_id, query, limit)
+    else:
+        ids = _prefix_index(school_id).search(query, limit)
+    qs = Student.objects.using(alias).filter(pk__in=ids)
+    if school_id:
+        qs = qs.filter(school_id=school_id)
+    found = qs.in_bulk()
+    return [found[pk] for pk in ids if pk in found]
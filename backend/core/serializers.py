@@ -1,113 +1,372 @@
+import sys
+
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
 from . import models
 
-class SchoolSerializer(serializers.ModelSerializer):
+def requested(request, param):
+    """Comma-separated query parameter as a set (empty when absent)."""
+    if request is None:
+        return set()
+    return {v.strip() for v in request.query_params.get(param, "").split(",") if v.strip()}
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """On GET, `?fields=a,b` keeps only those fields and `?expand=rel` nests a
+    related object instead of its id.
+
+    `expandable_fields` maps a relation name to a serializer (class or class
+    name in this module), or to `(serializer, {"many": True})` for reverse
+    relations. SparseFieldsFilter applies the matching select_related /
+    prefetch_related / only() to the queryset.
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+        for name in requested(request, "expand") & set(self.expandable_fields):
+            serializer_class, options = self.expansion(name)
+            self.fields[name] = serializer_class(read_only=True, **options)
+        keep = requested(request, "fields")
+        if keep:
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
+    @classmethod
+    def expansion(cls, name):
+        spec = cls.expandable_fields[name]
+        serializer_class, options = spec if isinstance(spec, tuple) else (spec, {})
+        if isinstance(serializer_class, str):
+            serializer_class = getattr(sys.modules[__name__], serializer_class)
+        return serializer_class, options
+
+class SchoolSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = models.School
         fields = "__all__"
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"school": "SchoolSerializer"}
+
     class Meta:
         model = models.User
         fields = ["id","email","role","school","is_active","is_staff","date_joined"]
         read_only_fields = ["date_joined"]
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"school": "SchoolSerializer", "user": "UserSerializer"}
+
     class Meta:
         model = models.Student
         fields = "__all__"
 
-class TeacherSerializer(serializers.ModelSerializer):
+class StudentSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=50)
+    school = serializers.IntegerField(required=False)
+
+class StudentImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    school = serializers.PrimaryKeyRelatedField(queryset=models.School.objects.all(), required=False)
+
+class TeacherSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"school": "SchoolSerializer", "user": "UserSerializer"}
+
     class Meta:
         model = models.Teacher
         fields = "__all__"
 
-class AcademicYearSerializer(serializers.ModelSerializer):
+class AcademicYearSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"school": "SchoolSerializer"}
+
     class Meta:
         model = models.AcademicYear
         fields = "__all__"
 
-class TermSerializer(serializers.ModelSerializer):
+class TermSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"academic_year": "AcademicYearSerializer"}
+
     class Meta:
         model = models.Term
         fields = "__all__"
 
-class GradeSerializer(serializers.ModelSerializer):
+class GradeSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"school": "SchoolSerializer"}
+
     class Meta:
         model = models.Grade
         fields = "__all__"
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"grade": "GradeSerializer"}
+
     class Meta:
         model = models.Section
         fields = "__all__"
 
-class SubjectSerializer(serializers.ModelSerializer):
+class SubjectSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"school": "SchoolSerializer"}
+
     class Meta:
         model = models.Subject
         fields = "__all__"
 
-class EnrollmentSerializer(serializers.ModelSerializer):
+class EnrollmentSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {
+        "student": "StudentSerializer",
+        "academic_year": "AcademicYearSerializer",
+        "section": "SectionSerializer",
+    }
+
     class Meta:
         model = models.Enrollment
         fields = "__all__"
 
-class TeacherAssignmentSerializer(serializers.ModelSerializer):
+class TeacherAssignmentSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {
+        "teacher": "TeacherSerializer",
+        "term": "TermSerializer",
+        "section": "SectionSerializer",
+        "subject": "SubjectSerializer",
+    }
+
     class Meta:
         model = models.TeacherAssignment
         fields = "__all__"
 
-class AttendanceSessionSerializer(serializers.ModelSerializer):
+class UnavailabilitySerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"teacher": "TeacherSerializer", "section": "SectionSerializer"}
+
+    class Meta:
+        model = models.Unavailability
+        fields = "__all__"
+
+    def validate(self, attrs):
+        teacher = attrs.get("teacher", getattr(self.instance, "teacher", None))
+        section = attrs.get("section", getattr(self.instance, "section", None))
+        if (teacher is None) == (section is None):
+            raise serializers.ValidationError("Set exactly one of teacher or section.")
+        return attrs
+
+class TimetableSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"term": "TermSerializer"}
+
+    class Meta:
+        model = models.Timetable
+        fields = "__all__"
+        read_only_fields = ["unplaced", "stats", "generated_at"]
+
+class TimetableEntrySerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {
+        "assignment": "TeacherAssignmentSerializer",
+        "teacher": "TeacherSerializer",
+        "section": "SectionSerializer",
+    }
+
+    class Meta:
+        model = models.TimetableEntry
+        fields = "__all__"
+
+class TimetableGenerateSerializer(serializers.Serializer):
+    term = serializers.IntegerField()
+    days = serializers.IntegerField(required=False, min_value=1, max_value=7)
+    periods_per_day = serializers.IntegerField(required=False, min_value=1, max_value=16)
+    time_budget = serializers.FloatField(required=False, min_value=0, max_value=600)
+    seed = serializers.IntegerField(required=False)
+
+class TimetableResolveSerializer(serializers.Serializer):
+    assignments = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    time_budget = serializers.FloatField(required=False, min_value=0, max_value=600)
+    seed = serializers.IntegerField(required=False)
+
+class TimetableGridSerializer(serializers.Serializer):
+    section = serializers.IntegerField(required=False, min_value=1)
+    teacher = serializers.IntegerField(required=False, min_value=1)
+
+    def validate(self, attrs):
+        if "section" not in attrs and "teacher" not in attrs:
+            raise serializers.ValidationError({"section": "Pass section or teacher."})
+        return attrs
+
+class AttendanceSessionSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"term": "TermSerializer", "section": "SectionSerializer"}
+
     class Meta:
         model = models.AttendanceSession
         fields = "__all__"
 
-class AttendanceRecordSerializer(serializers.ModelSerializer):
+class AttendanceRecordSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"session": "AttendanceSessionSerializer", "student": "StudentSerializer"}
+
     class Meta:
         model = models.AttendanceRecord
         fields = "__all__"
+        # The model's unique_together also names the non-editable academic_year partition key.
+        validators = [UniqueTogetherValidator(models.AttendanceRecord.objects.all(), fields=["session", "student"])]
+
+class RosterEntrySerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=models.AttendanceRecord.Status.choices)
+    note = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+class AttendanceRosterSerializer(serializers.Serializer):
+    """Whole-class attendance for one session, upserted in a single statement."""
+    records = RosterEntrySerializer(many=True, allow_empty=False)
+
+    def validate_records(self, value):
+        seen = set()
+        for entry in value:
+            if entry["student"] in seen:
+                raise serializers.ValidationError(f"Student {entry['student']} appears more than once.")
+            seen.add(entry["student"])
+        return value
+
+class AttendanceAnalyticsQuerySerializer(serializers.Serializer):
+    term = serializers.IntegerField()
+    section = serializers.IntegerField(required=False)
+    threshold = serializers.FloatField(required=False, default=10.0, min_value=0, max_value=100)
+
+class ReportCardQuerySerializer(serializers.Serializer):
+    term = serializers.IntegerField()
+    section = serializers.IntegerField(required=False)
+    grade = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if ("section" in attrs) == ("grade" in attrs):
+            raise serializers.ValidationError("Pass exactly one of section or grade.")
+        return attrs
+
+class AssessmentSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"term": "TermSerializer", "section": "SectionSerializer", "subject": "SubjectSerializer"}
 
-class AssessmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Assessment
         fields = "__all__"
 
-class AssessmentScoreSerializer(serializers.ModelSerializer):
+class AssessmentScoreSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"assessment": "AssessmentSerializer", "student": "StudentSerializer"}
+
     class Meta:
         model = models.AssessmentScore
         fields = "__all__"
+        # The model's unique_together also names the non-editable academic_year partition key.
+        validators = [UniqueTogetherValidator(models.AssessmentScore.objects.all(), fields=["assessment", "student"])]
+
+class TermResultSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"student": "StudentSerializer", "subject": "SubjectSerializer"}
+
+    class Meta:
+        model = models.TermResult
+        fields = "__all__"
+
+class FeeHeadSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"school": "SchoolSerializer"}
 
-class FeeHeadSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.FeeHead
         fields = "__all__"
 
-class FeeStructureSerializer(serializers.ModelSerializer):
+class FeeStructureSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {
+        "academic_year": "AcademicYearSerializer",
+        "grade": "GradeSerializer",
+        "items": ("FeeStructureItemSerializer", {"many": True}),
+    }
+
     class Meta:
         model = models.FeeStructure
         fields = "__all__"
 
-class FeeStructureItemSerializer(serializers.ModelSerializer):
+ROLLOVER_CLONABLE = ("terms", "fee_structures", "teacher_assignments")  # core.rollover.CLONABLE
+
+class RolloverSerializer(serializers.Serializer):
+    """Into an existing `target` year, or a new one from name/starts_on/ends_on."""
+    target = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=50, required=False)
+    starts_on = serializers.DateField(required=False)
+    ends_on = serializers.DateField(required=False)
+    repeat = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    leave = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    clone = serializers.MultipleChoiceField(choices=ROLLOVER_CLONABLE, required=False, default=ROLLOVER_CLONABLE)
+    activate = serializers.BooleanField(required=False, default=False)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        new_year = [attrs.get(k) for k in ("name", "starts_on", "ends_on")]
+        if ("target" in attrs) == all(new_year):
+            raise serializers.ValidationError("Pass either target or name, starts_on and ends_on.")
+        if all(new_year) and attrs["ends_on"] < attrs["starts_on"]:
+            raise serializers.ValidationError("ends_on is before starts_on.")
+        if set(attrs["repeat"]) & set(attrs["leave"]):
+            raise serializers.ValidationError("A student cannot both repeat and leave.")
+        attrs["clone"] = [c for c in ROLLOVER_CLONABLE if c in attrs["clone"]]
+        return attrs
+
+class InvoiceGenerationSerializer(serializers.Serializer):
+    issued_on = serializers.DateField(required=False)
+    due_on = serializers.DateField(required=False, allow_null=True)
+
+class FeeStructureItemSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"fee_head": "FeeHeadSerializer"}
+
     class Meta:
         model = models.FeeStructureItem
         fields = "__all__"
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {
+        "student": "StudentSerializer",
+        "academic_year": "AcademicYearSerializer",
+        "items": ("InvoiceItemSerializer", {"many": True}),
+        "allocations": ("PaymentAllocationSerializer", {"many": True}),
+    }
+
     class Meta:
         model = models.Invoice
         fields = "__all__"
+        read_only_fields = ["fee_structure", "status", "total", "paid", "balance"]
+
+class InvoiceItemSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"fee_head": "FeeHeadSerializer"}
 
-class InvoiceItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.InvoiceItem
         fields = "__all__"
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"student": "StudentSerializer", "allocations": ("PaymentAllocationSerializer", {"many": True})}
+
     class Meta:
         model = models.Payment
         fields = "__all__"
 
-class PaymentAllocationSerializer(serializers.ModelSerializer):
+class PaymentBatchSerializer(serializers.Serializer):
+    paid_on = serializers.DateField()
+
+class AllocationSummarySerializer(serializers.Serializer):
+    payments = serializers.IntegerField()
+    allocations = serializers.IntegerField()
+    allocated = serializers.DecimalField(max_digits=14, decimal_places=2)
+    unallocated = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+class PaymentAllocationSerializer(DynamicFieldsModelSerializer):
+    expandable_fields = {"payment": "PaymentSerializer", "invoice": "InvoiceSerializer"}
+
     class Meta:
         model = models.PaymentAllocation
         fields = "__all__"
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Job
+        fields = [
+            "id", "name", "status", "progress_done", "progress_total", "result", "error",
+            "attempts", "max_attempts", "run_after", "created_by", "created_at", "finished_at",
+        ]
+        read_only_fields = fields
+
+class SyncQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0)
+    limit = serializers.IntegerField(min_value=1, max_value=2000, default=500)
@@ -0,0 +1,173 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from . import analytics, billing, caching, partitions, search, sync
+from .models import (
+    AcademicYear, Assessment, AssessmentScore, AttendanceRecord, AttendanceSession, Enrollment, FeeHead, Grade, Invoice,
+    InvoiceItem, Payment, PaymentAllocation, School, Section, Student, Subject, TeacherAssignment, Term, TimetableEntry,
+)
+from .permissions import invalidate_teacher_scopes
+
+REFERENCE_MODELS = (School, AcademicYear, Term, Grade, Section, Subject, FeeHead)
+
+def reference_data_changed(sender, **kwargs):
+    caching.invalidate_reference_data()
+
+for model in REFERENCE_MODELS:
+    post_save.connect(reference_data_changed, sender=model, dispatch_uid=f"refcache-save-{model.__name__}")
+    post_delete.connect(reference_data_changed, sender=model, dispatch_uid=f"refcache-delete-{model.__name__}")
+
+STUDENT_TENANT_MODELS = (Enrollment, AttendanceRecord, AssessmentScore, Invoice, Payment)
+
+def school_of_student(student_id):
+    # Read, not cached: a per-process cache would keep stamping rows with the old
+    # school after a transfer. Bulk writers set school_id themselves.
+    return Student.objects.filter(pk=student_id).values_list("school_id", flat=True).first()
+
+def school_of_section(section_id):
+    key = f"section-school:{caching.generation()}:{section_id}"
+    school_id = cache.get(key)
+    if school_id is None:
+        school_id = Section.objects.filter(pk=section_id).values_list("grade__school_id", flat=True).first()
+        cache.set(key, school_id, None)
+    return school_id
+
+def student_row_loaded(sender, instance, **kwargs):
+    instance._loaded_student_id = instance.__dict__.get("student_id")
+
+def student_row_saving(sender, instance, **kwargs):
+    if sender.student.is_cached(instance):
+        instance.school_id = instance.student.school_id
+    elif (
+        instance._state.adding or instance.school_id is None
+        or instance.student_id != getattr(instance, "_loaded_student_id", None)
+    ):
+        instance.school_id = school_of_student(instance.student_id)
+    # Otherwise an update of the same student: school_id is already right
+    # (student_saved moves a transferred student's rows).
+
+for model in STUDENT_TENANT_MODELS:
+    post_init.connect(student_row_loaded, sender=model, dispatch_uid=f"tenant-init-{model.__name__}")
+    pre_save.connect(student_row_saving, sender=model, dispatch_uid=f"tenant-{model.__name__}")
+
+@receiver(pre_save, sender=AttendanceSession)
+def attendance_session_saving(sender, instance, **kwargs):
+    instance.school_id = school_of_section(instance.section_id)
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, **kwargs):
+    search.invalidate(instance.school_id)
+    if not created:
+        for model in STUDENT_TENANT_MODELS:
+            model.objects.filter(student=instance).exclude(school_id=instance.school_id).update(school_id=instance.school_id)
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    search.invalidate(instance.school_id)
+
+@receiver(post_save, sender=AcademicYear)
+def academic_year_saved(sender, instance, created, **kwargs):
+    if created:
+        partitions.ensure_partition(instance.pk)
+
+@receiver(pre_save, sender=AttendanceRecord)
+def attendance_record_saving(sender, instance, **kwargs):
+    instance.academic_year_id = partitions.year_of_session(instance.session_id)
+
+@receiver(pre_save, sender=AssessmentScore)
+def assessment_score_saving(sender, instance, **kwargs):
+    instance.academic_year_id = partitions.year_of_assessment(instance.assessment_id)
+
+@receiver(post_save, sender=AttendanceSession)
+def attendance_session_moved(sender, instance, created, **kwargs):
+    if not created:
+        year_id = partitions.year_of_term(instance.term_id)
+        AttendanceRecord.objects.filter(session=instance).exclude(academic_year_id=year_id).update(academic_year_id=year_id)
+
+@receiver(post_save, sender=Assessment)
+def assessment_moved(sender, instance, created, **kwargs):
+    if not created:
+        year_id = partitions.year_of_term(instance.term_id)
+        AssessmentScore.objects.filter(assessment=instance).exclude(academic_year_id=year_id).update(academic_year_id=year_id)
+
+@receiver(pre_save, sender=TeacherAssignment)
+def teacher_assignment_saving(sender, instance, **kwargs):
+    # Remember the stored teacher: moving an assignment must revoke their cached scopes too.
+    instance._stored_teacher_id = (
+        sender.objects.filter(pk=instance.pk).values_list("teacher_id", flat=True).first() if instance.pk else None
+    )
+
+@receiver([post_save, post_delete], sender=TeacherAssignment)
+def teacher_assignment_changed(sender, instance, **kwargs):
+    for teacher_id in {instance.teacher_id, getattr(instance, "_stored_teacher_id", None)} - {None}:
+        invalidate_teacher_scopes(teacher_id)
+
+@receiver(pre_save, sender=TimetableEntry)
+def timetable_entry_saving(sender, instance, **kwargs):
+    instance.teacher_id, instance.section_id = (
+        TeacherAssignment.objects.filter(pk=instance.assignment_id).values_list("teacher_id", "section_id").get()
+    )
+
+def _remember_amount(sender, instance):
+    """Stash the stored (invoice_id, amount) so post_save can apply a delta."""
+    instance._stored_amount = None
+    if instance.pk:
+        instance._stored_amount = sender.objects.filter(pk=instance.pk).values_list("invoice_id", "amount").first()
+
+def _apply_amount_change(instance, column, created):
+    stored = None if created else getattr(instance, "_stored_amount", None)
+    amount = Decimal(instance.amount)
+    if stored and stored[0] != instance.invoice_id:
+        billing.apply_invoice_delta(stored[0], **{column: -stored[1]})
+        stored = None
+    billing.apply_invoice_delta(instance.invoice_id, **{column: amount - (stored[1] if stored else 0)})
+
+@receiver(pre_save, sender=InvoiceItem)
+@receiver(pre_save, sender=PaymentAllocation)
+def invoice_line_saving(sender, instance, **kwargs):
+    _remember_amount(sender, instance)
+
+@receiver(post_save, sender=InvoiceItem)
+def invoice_item_saved(sender, instance, created, **kwargs):
+    _apply_amount_change(instance, "total", created)
+
+@receiver(post_save, sender=PaymentAllocation)
+def payment_allocation_saved(sender, instance, created, **kwargs):
+    _apply_amount_change(instance, "paid", created)
+
+@receiver(post_delete, sender=InvoiceItem)
+def invoice_item_deleted(sender, instance, **kwargs):
+    billing.apply_invoice_delta(instance.invoice_id, total=-Decimal(instance.amount))
+
+@receiver(post_delete, sender=PaymentAllocation)
+def payment_allocation_deleted(sender, instance, **kwargs):
+    billing.apply_invoice_delta(instance.invoice_id, paid=-Decimal(instance.amount))
+
+@receiver([post_save, post_delete], sender=AttendanceSession)
+def attendance_session_changed(sender, instance, **kwargs):
+    analytics.forget_session(instance.pk)
+    analytics.invalidate(instance.term_id, instance.section_id)
+
+@receiver([post_save, post_delete], sender=AttendanceRecord)
+def attendance_record_changed(sender, instance, **kwargs):
+    scope = analytics.session_scope(instance.session_id)
+    if scope:
+        analytics.invalidate(*scope)
+
+def synced_row_saved(sender, instance, **kwargs):
+    sync.record_changes(sender.objects.filter(pk=instance.pk))
+
+def synced_row_deleting(sender, instance, **kwargs):
+    # Capture scope while the row (and its parents) still exist.
+    instance._sync_scope = sync.scopes(sender.objects.filter(pk=instance.pk)).get(instance.pk)
+
+def synced_row_deleted(sender, instance, **kwargs):
+    scope = getattr(instance, "_sync_scope", None) or (None, None, None)
+    sync.record_changes(sender.objects.none(), deleted=True, known_scopes={instance.pk: scope})
+
+for model in (Enrollment, AttendanceRecord, AssessmentScore):
+    post_save.connect(synced_row_saved, sender=model, dispatch_uid=f"sync-save-{model.__name__}")
+    pre_delete.connect(synced_row_deleting, sender=model, dispatch_uid=f"sync-predelete-{model.__name__}")
+    post_delete.connect(synced_row_deleted, sender=model, dispatch_uid=f"sync-delete-{model.__name__}")
@@ -0,0 +1,102 @@
+"""Delta sync for offline clients: change capture and "changes since cursor" reads.
+
+Every save/delete of a synced model appends a SyncChange row (core.signals);
+bulk writers call record_changes() themselves. Clients keep the last `seq`
+they saw and ask for everything after it.
+
+That is only safe if `seq` follows commit order: a transaction that took seq 5
+but commits after one that took seq 6 would otherwise be skipped by a client
+that already read 6. So change rows are written under a transaction-scoped
+lock, held until commit, which serializes the writers. SQLite allows one
+writer at a time anyway; on PostgreSQL it is an advisory lock, so keep
+transactions that record changes short.
+"""
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import serializers
+from .models import AssessmentScore, AttendanceRecord, Enrollment, SyncChange, User
+from .permissions import teacher_scopes
+
+# model label -> (model, payload key, serializer, (school, section, student) lookups)
+SYNCED = {
+    "enrollment": (Enrollment, "enrollments", serializers.EnrollmentSerializer,
+                   ("school_id", "section_id", "student_id")),
+    "attendancerecord": (AttendanceRecord, "attendance_records", serializers.AttendanceRecordSerializer,
+                         ("school_id", "session__section_id", "student_id")),
+    "assessmentscore": (AssessmentScore, "assessment_scores", serializers.AssessmentScoreSerializer,
+                        ("school_id", "assessment__section_id", "student_id")),
+}
+
+SEQ_LOCK = 0x5EC5  # advisory lock key serializing SyncChange writers
+
+def label_for(model):
+    return model._meta.model_name
+
+def scopes(queryset):
+    """{pk: (school_id, section_id, student_id)} for rows of a synced model, in one query."""
+    lookups = SYNCED[label_for(queryset.model)][3]
+    return {pk: rest for pk, *rest in queryset.values_list("pk", *lookups)}
+
+def record_changes(queryset, deleted=False, known_scopes=None):
+    """Append one change row per object in `queryset` (or per entry of `known_scopes`)."""
+    label = label_for(queryset.model)
+    rows = known_scopes if known_scopes is not None else scopes(queryset)
+    if not rows:
+        return
+    now = timezone.now()
+    alias = router.db_for_write(SyncChange)
+    with transaction.atomic(using=alias):
+        connection = connections[alias]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [SEQ_LOCK])
+        SyncChange.objects.using(alias).bulk_create(
+            [
+                SyncChange(model=label, object_id=pk, deleted=deleted, school_id=school_id,
+                           section_id=section_id, student_id=student_id, changed_at=now)
+                for pk, (school_id, section_id, student_id) in rows.items()
+            ],
+            batch_size=1000,
+        )
+
+def current_cursor():
+    return SyncChange.objects.aggregate(m=Max("seq"))["m"] or 0
+
+def scoped_changes(user):
+    qs = SyncChange.objects.all()
+    if user.role == User.Role.STUDENT:
+        student = getattr(user, "student_profile", None)
+        return qs.filter(student=student) if student else qs.none()
+    if user.role == User.Role.TEACHER:
+        teacher = getattr(user, "teacher_profile", None)
+        if not teacher:
+            return qs.none()
+        qs = qs.filter(section_id__in={section for _, section, _ in teacher_scopes(teacher.id)})
+    if user.school_id:
+        qs = qs.filter(school_id=user.school_id)
+    elif not user.is_superuser:
+        return qs.none()
+    return qs
+
+def changes_since(user, since, limit, context=None):
+    """Up to `limit` change rows after `since`, collapsed to the latest state per object."""
+    page = list(
+        scoped_changes(user)
+        .filter(seq__gt=since)
+        .order_by("seq")
+        .values_list("seq", "model", "object_id", "deleted")[:limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    latest = {}
+    for seq, label, object_id, deleted in page:
+        latest[(label, object_id)] = deleted
+    payload = {"cursor": page[-1][0] if page else since, "has_more": has_more, "changes": {}, "deleted": {}}
+    for label, (model, key, serializer_class, _) in SYNCED.items():
+        live = [pk for (lbl, pk), deleted in latest.items() if lbl == label and not deleted]
+        payload["deleted"][key] = [pk for (lbl, pk), deleted in latest.items() if lbl == label and deleted]
+        payload["changes"][key] = serializer_class(model.objects.filter(pk__in=live), many=True, context=context).data
+    return payload
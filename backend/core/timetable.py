@@ -0,0 +1,228 @@
+"""Weekly timetables built from a term's TeacherAssignments.
+
+Each assignment becomes `periods_per_week` lessons to place in a days x periods
+grid so that no teacher and no section has two lessons in one slot and nobody
+is scheduled in a slot marked as Unavailability. The solver keeps a bitmask of
+busy slots per teacher and per section:
+
+1. greedy: lessons are placed most-constrained first (fewest free slots),
+   preferring days on which the same assignment has no lesson yet;
+2. min-conflicts local search: while lessons are left over and the time budget
+   lasts, one of them goes into the slot that displaces the fewest lessons
+   (a short tabu list stops displaced lessons bouncing straight back) and the
+   displaced lessons are queued again. The best state seen is kept.
+
+`resolve` starts from the stored timetable with only the changed assignments
+taken off, so editing one assignment moves as few other lessons as it can.
+"""
+import random
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TeacherAssignment, Timetable, TimetableEntry, Unavailability
+
+TABU_TENURE = 10
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+class Solver:
+    """Lessons are (assignment_id, teacher_id, section_id); slot = day * periods + period."""
+
+    def __init__(self, days, periods, lessons, blocked_teachers=None, blocked_sections=None, seed=None):
+        self.days, self.periods = days, periods
+        self.full = (1 << days * periods) - 1
+        self.lessons = lessons
+        self.rng = random.Random(seed)
+        self.allowed = [
+            self.full & ~((blocked_teachers or {}).get(t, 0) | (blocked_sections or {}).get(s, 0))
+            for _, t, s in lessons
+        ]
+        self.reset()
+
+    def reset(self):
+        self.slot = [-1] * len(self.lessons)
+        self.teacher_busy = defaultdict(int)
+        self.section_busy = defaultdict(int)
+        self.by_teacher = {}
+        self.by_section = {}
+        self.per_day = Counter()
+
+    def place(self, lesson, slot):
+        assignment, teacher, section = self.lessons[lesson]
+        self.slot[lesson] = slot
+        self.teacher_busy[teacher] |= 1 << slot
+        self.section_busy[section] |= 1 << slot
+        self.by_teacher[teacher, slot] = lesson
+        self.by_section[section, slot] = lesson
+        self.per_day[assignment, slot // self.periods] += 1
+
+    def remove(self, lesson):
+        assignment, teacher, section = self.lessons[lesson]
+        slot = self.slot[lesson]
+        self.slot[lesson] = -1
+        self.teacher_busy[teacher] &= ~(1 << slot)
+        self.section_busy[section] &= ~(1 << slot)
+        del self.by_teacher[teacher, slot]
+        del self.by_section[section, slot]
+        self.per_day[assignment, slot // self.periods] -= 1
+
+    def free(self, lesson):
+        _, teacher, section = self.lessons[lesson]
+        return self.allowed[lesson] & ~(self.teacher_busy[teacher] | self.section_busy[section])
+
+    def unplaced(self):
+        return [lesson for lesson, slot in enumerate(self.slot) if slot < 0]
+
+    def greedy(self, lessons):
+        """Place `lessons` into free slots, most constrained first; returns those that did not fit."""
+        left = []
+        for lesson in sorted(lessons, key=lambda l: (self.free(l).bit_count(), self.rng.random())):
+            free = self.free(lesson)
+            if not free:
+                left.append(lesson)
+                continue
+            assignment = self.lessons[lesson][0]
+            slot = min(_bits(free), key=lambda s: (self.per_day[assignment, s // self.periods], self.rng.random()))
+            self.place(lesson, slot)
+        return left
+
+    def search(self, queue, deadline):
+        """Min-conflicts repair of the `queue` of unplaced lessons until it is empty or time runs out."""
+        queue = [lesson for lesson in queue if self.allowed[lesson]]
+        best, best_slots = len(queue), list(self.slot)
+        tabu = {}
+        iterations = 0
+        while queue and time.monotonic() < deadline:
+            iterations += 1
+            lesson = queue.pop(self.rng.randrange(len(queue)))
+            assignment, teacher, section = self.lessons[lesson]
+            choice, displaced = None, ()
+            for slot in _bits(self.allowed[lesson]):
+                clashes = {self.by_teacher.get((teacher, slot)), self.by_section.get((section, slot))} - {None}
+                score = (
+                    10 * len(clashes)
+                    + self.per_day[assignment, slot // self.periods]
+                    + (100 if tabu.get((lesson, slot), 0) > iterations else 0)
+                    + self.rng.random()
+                )
+                if choice is None or score < choice:
+                    choice, target, displaced = score, slot, clashes
+            for other in displaced:
+                tabu[other, target] = iterations + TABU_TENURE
+                self.remove(other)
+                queue.append(other)
+            self.place(lesson, target)
+            if len(queue) < best:
+                best, best_slots = len(queue), list(self.slot)
+        if queue and best < len(queue):
+            self.reset()
+            for lesson, slot in enumerate(best_slots):
+                if slot >= 0:
+                    self.place(lesson, slot)
+        return iterations
+
+    def solve(self, deadline):
+        started = time.monotonic()
+        left = self.greedy(self.unplaced())
+        greedy_left = len(left)
+        iterations = self.search(left, deadline) if left else 0
+        return {"greedy_unplaced": greedy_left, "iterations": iterations, "seconds": round(time.monotonic() - started, 3)}
+
+def _problem(timetable):
+    assignments = list(
+        TeacherAssignment.objects.filter(term_id=timetable.term_id, periods_per_week__gt=0)
+        .order_by("id").values_list("id", "teacher_id", "section_id", "periods_per_week")
+    )
+    lessons = [(pk, teacher, section) for pk, teacher, section, count in assignments for _ in range(count)]
+    teachers = {teacher for _, teacher, _, _ in assignments}
+    sections = {section for _, _, section, _ in assignments}
+    blocked_teachers, blocked_sections = defaultdict(int), defaultdict(int)
+    rows = Unavailability.objects.filter(
+        day__lt=timetable.days, period__lt=timetable.periods_per_day, teacher_id__in=teachers,
+    ).values_list("teacher_id", "section_id", "day", "period").union(
+        Unavailability.objects.filter(
+            day__lt=timetable.days, period__lt=timetable.periods_per_day, section_id__in=sections,
+        ).values_list("teacher_id", "section_id", "day", "period")
+    )
+    for teacher, section, day, period in rows:
+        bit = 1 << (day * timetable.periods_per_day + period)
+        if teacher:
+            blocked_teachers[teacher] |= bit
+        else:
+            blocked_sections[section] |= bit
+    return lessons, blocked_teachers, blocked_sections
+
+def _deadline(time_budget):
+    budget = time_budget if time_budget is not None else getattr(settings, "TIMETABLE_TIME_BUDGET", 10)
+    return time.monotonic() + budget
+
+def _save(timetable, solver, stats):
+    """Write the solver's placements, touching only entries that changed; returns how many did."""
+    periods = timetable.periods_per_day
+    wanted = Counter(
+        (*solver.lessons[lesson], slot // periods, slot % periods)
+        for lesson, slot in enumerate(solver.slot) if slot >= 0
+    )
+    stale = []
+    for entry in timetable.entries.values_list("id", "assignment_id", "teacher_id", "section_id", "day", "period"):
+        key = entry[1:]
+        if wanted[key]:
+            wanted[key] -= 1
+        else:
+            stale.append(entry[0])
+    created = [
+        TimetableEntry(timetable=timetable, assignment_id=a, teacher_id=t, section_id=s, day=day, period=period)
+        for (a, t, s, day, period), count in wanted.items() for _ in range(count)
+    ]
+    unplaced = Counter(solver.lessons[lesson][0] for lesson in solver.unplaced())
+    with transaction.atomic():
+        TimetableEntry.objects.filter(id__in=stale).delete()
+        TimetableEntry.objects.bulk_create(created, batch_size=1000)
+        timetable.unplaced = sum(unplaced.values())
+        timetable.stats = {
+            **stats, "lessons": len(solver.lessons), "changed": len(stale) + len(created),
+            "unplaced_assignments": {str(pk): count for pk, count in sorted(unplaced.items())},
+        }
+        timetable.generated_at = timezone.now()
+        timetable.save()
+    return timetable
+
+def generate(term, days=None, periods_per_day=None, time_budget=None, seed=None):
+    """(Re)build the term's timetable from scratch."""
+    timetable, _ = Timetable.objects.get_or_create(term=term, defaults={
+        "days": getattr(settings, "TIMETABLE_DAYS", 5),
+        "periods_per_day": getattr(settings, "TIMETABLE_PERIODS_PER_DAY", 8),
+    })
+    timetable.days = days or timetable.days
+    timetable.periods_per_day = periods_per_day or timetable.periods_per_day
+    deadline = _deadline(time_budget)
+    lessons, blocked_teachers, blocked_sections = _problem(timetable)
+    solver = Solver(timetable.days, timetable.periods_per_day, lessons, blocked_teachers, blocked_sections, seed)
+    return _save(timetable, solver, solver.solve(deadline))
+
+def resolve(timetable, assignments=(), time_budget=None, seed=None):
+    """Repair the stored timetable after `assignments` (ids) changed; other lessons start where they are."""
+    deadline = _deadline(time_budget)
+    changed = set(assignments)
+    lessons, blocked_teachers, blocked_sections = _problem(timetable)
+    solver = Solver(timetable.days, timetable.periods_per_day, lessons, blocked_teachers, blocked_sections, seed)
+    pending = defaultdict(list)
+    for lesson, (assignment, teacher, section) in enumerate(lessons):
+        pending[assignment, teacher, section].append(lesson)
+    entries = timetable.entries.exclude(assignment_id__in=changed).values_list("assignment_id", "teacher_id", "section_id", "day", "period")
+    for assignment, teacher, section, day, period in entries:
+        if not pending[assignment, teacher, section] or day >= timetable.days or period >= timetable.periods_per_day:
+            continue
+        lesson = pending[assignment, teacher, section].pop()
+        slot = day * timetable.periods_per_day + period
+        if solver.free(lesson) >> slot & 1:
+            solver.place(lesson, slot)
+    return _save(timetable, solver, solver.solve(deadline))
@@ -1,20 +1,49 @@
-from rest_framework import viewsets
+import csv
+import io
+
+from django.db import transaction
+from django.db.models import Q
+from django.http import FileResponse
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
-from . import models, serializers
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from . import analytics, billing, gradebook, imports, jobs, models, partitions, reportcards, rollover, search, serializers, sync, timetable
+from .caching import ReferenceCacheMixin
+from .exports import ExportMixin
 from .models import User
-from .permissions import AdminRegistrarFinanceTeacherReadOnly, TeacherCanModifyAssigned
+from .pagination import LedgerPagination, ReferencePagination
+from .permissions import (
+    AdminRegistrarFinanceTeacherReadOnly, IsFinanceLike, IsRegistrarLike, IsStaffRole, TeacherCanModifyAssigned,
+    teacher_scopes,
+)
+
+def wants_async(request):
+    return request.query_params.get("async", "").lower() in ("1", "true", "yes")
+
+def job_accepted(job, request):
+    """202 response pointing at the progress endpoint of a queued job."""
+    data = serializers.JobSerializer(job).data
+    data["url"] = reverse("job-detail", args=[job.pk], request=request)
+    return Response(data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["url"]})
 
 def filter_by_school(qs, user):
+    if isinstance(qs, models.TenantQuerySet):
+        # Denormalized school_id: scope through the tenant manager, no joins.
+        return qs.for_school(user.school_id)
     if user.is_superuser or user.role == User.Role.ADMIN:
         return qs.filter(school=user.school) if hasattr(qs.model, "school_id") and user.school_id else qs
     if hasattr(qs.model, "school_id") and user.school_id:
         return qs.filter(school=user.school)
     return qs
 
-class SchoolViewSet(viewsets.ModelViewSet):
+class SchoolViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = models.School.objects.all()
     serializer_class = serializers.SchoolSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ReferencePagination
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = models.User.objects.all()
@@ -29,10 +58,13 @@ class UserViewSet(viewsets.ModelViewSet):
             return models.User.objects.filter(school=u.school)
         return models.User.objects.none()
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = models.Student.objects.all()
     serializer_class = serializers.StudentSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {"admission_no": "admission_no", "school": "school_id"}
+    ordering_fields = ["id", "admission_no", "last_name"]
+    export_fields = ["id", "admission_no", "first_name", "last_name", "dob", "gender", "school_id", "created_at"]
 
     def get_queryset(self):
         u=self.request.user
@@ -41,6 +73,30 @@ class StudentViewSet(viewsets.ModelViewSet):
         qs = models.Student.objects.all()
         return filter_by_school(qs, u)
 
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsStaffRole])
+    def search(self, request):
+        """Typeahead: `?q=<name or admission no>&limit=10` -> best matches in the caller's school."""
+        params = serializers.StudentSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        school_id = request.user.school_id or data.get("school")
+        students = search.search_students(data["q"], school_id=school_id, limit=data["limit"])
+        return Response({"results": self.get_serializer(students, many=True).data})
+
+    @action(detail=False, methods=["post"], url_path="import", permission_classes=[IsAuthenticated, IsRegistrarLike])
+    def import_csv(self, request):
+        """Bulk-create students, logins and enrollments from an uploaded CSV; returns a per-row report."""
+        params = serializers.StudentImportSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        school = request.user.school or params.validated_data.get("school")
+        if school is None:
+            raise ValidationError({"school": "This field is required."})
+        upload = io.TextIOWrapper(params.validated_data["file"], encoding="utf-8-sig")
+        if wants_async(request):
+            job = jobs.enqueue("imports.import_students", {"school": school.pk, "csv_text": upload.read()}, request.user)
+            return job_accepted(job, request)
+        return Response(imports.import_students(school, csv.DictReader(upload)))
+
 class TeacherViewSet(viewsets.ModelViewSet):
     queryset = models.Teacher.objects.all()
     serializer_class = serializers.TeacherSerializer
@@ -53,99 +109,353 @@ class TeacherViewSet(viewsets.ModelViewSet):
         qs = models.Teacher.objects.all()
         return filter_by_school(qs, u)
 
-class AcademicYearViewSet(viewsets.ModelViewSet):
+class AcademicYearViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = models.AcademicYear.objects.all()
     serializer_class = serializers.AcademicYearSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    pagination_class = ReferencePagination
+    filter_params = {"is_active": "is_active"}
 
     def get_queryset(self):
         return filter_by_school(models.AcademicYear.objects.all(), self.request.user)
 
-class TermViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsRegistrarLike])
+    def rollover(self, request, pk=None):
+        """Promote this year's active enrollments into the next year; `dry_run` returns the diff only."""
+        source = self.get_object()
+        params = serializers.RolloverSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        options = dict(params.validated_data)
+        years = models.AcademicYear.objects.filter(school_id=source.school_id)
+        if "target" in options:
+            options["target"] = years.exclude(pk=source.pk).filter(pk=options["target"]).first()
+            if options["target"] is None:
+                raise ValidationError({"target": "Unknown academic year for this school."})
+        elif years.filter(name=options["name"]).exists():
+            raise ValidationError({"name": "This school already has an academic year with this name."})
+        if wants_async(request) and not options["dry_run"]:
+            payload = {k: v.pk if k == "target" else v.isoformat() if hasattr(v, "isoformat") else v for k, v in options.items()}
+            return job_accepted(jobs.enqueue("rollover.rollover_year", {"source": source.pk, **payload}, request.user), request)
+        return Response(rollover.rollover(source, **options))
+
+class TermViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = models.Term.objects.all()
     serializer_class = serializers.TermSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    pagination_class = ReferencePagination
+    filter_params = {"academic_year": "academic_year_id"}
 
-class GradeViewSet(viewsets.ModelViewSet):
+class GradeViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = models.Grade.objects.all()
     serializer_class = serializers.GradeSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    pagination_class = ReferencePagination
     def get_queryset(self):
         return filter_by_school(models.Grade.objects.all(), self.request.user)
 
-class SectionViewSet(viewsets.ModelViewSet):
+class SectionViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = models.Section.objects.all()
     serializer_class = serializers.SectionSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    pagination_class = ReferencePagination
+    filter_params = {"grade": "grade_id"}
 
-class SubjectViewSet(viewsets.ModelViewSet):
+class SubjectViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = models.Subject.objects.all()
     serializer_class = serializers.SubjectSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    pagination_class = ReferencePagination
     def get_queryset(self):
         return filter_by_school(models.Subject.objects.all(), self.request.user)
 
-class EnrollmentViewSet(viewsets.ModelViewSet):
+class EnrollmentViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = models.Enrollment.objects.all()
     serializer_class = serializers.EnrollmentSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {
+        "academic_year": "academic_year_id",
+        "section": "section_id",
+        "status": "status__in",
+        "student": "student_id",
+    }
+    ordering_fields = ["id", "enrolled_on"]
+    export_fields = [
+        "id", "student_id", "student__admission_no", "academic_year__name",
+        "section__grade__name", "section__name", "enrolled_on", "status",
+    ]
 
     def get_queryset(self):
         u=self.request.user
         if u.role == User.Role.STUDENT and hasattr(u, "student_profile") and u.student_profile:
             return models.Enrollment.objects.filter(student=u.student_profile)
-        return models.Enrollment.objects.all()
+        return filter_by_school(models.Enrollment.objects.all(), u)
 
 class TeacherAssignmentViewSet(viewsets.ModelViewSet):
     queryset = models.TeacherAssignment.objects.all()
     serializer_class = serializers.TeacherAssignmentSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {"teacher": "teacher_id", "term": "term_id", "section": "section_id", "subject": "subject_id"}
+
+class UnavailabilityViewSet(viewsets.ModelViewSet):
+    queryset = models.Unavailability.objects.all()
+    serializer_class = serializers.UnavailabilitySerializer
+    permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {"teacher": "teacher_id", "section": "section_id", "day": "day"}
+
+    def get_queryset(self):
+        qs = models.Unavailability.objects.all()
+        school_id = self.request.user.school_id
+        if school_id:
+            qs = qs.filter(Q(teacher__school_id=school_id) | Q(section__grade__school_id=school_id))
+        return qs
+
+class TimetableViewSet(viewsets.ReadOnlyModelViewSet):
+    """Term timetables. `POST generate/` builds one from the term's teacher
+    assignments; `POST {id}/resolve/` repairs it after assignments changed;
+    `GET {id}/grid/?section=|teacher=` returns the week as days x periods."""
+    queryset = models.Timetable.objects.all()
+    serializer_class = serializers.TimetableSerializer
+    permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {"term": "term_id"}
+
+    def get_queryset(self):
+        qs = models.Timetable.objects.all()
+        if self.request.user.school_id:
+            qs = qs.filter(term__academic_year__school_id=self.request.user.school_id)
+        return qs
+
+    @action(detail=False, methods=["post"], permission_classes=[IsAuthenticated, IsRegistrarLike])
+    def generate(self, request):
+        params = serializers.TimetableGenerateSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        options = dict(params.validated_data)
+        terms = models.Term.objects.filter(pk=options["term"])
+        if request.user.school_id:
+            terms = terms.filter(academic_year__school_id=request.user.school_id)
+        if not terms.exists():
+            raise ValidationError({"term": "Unknown term."})
+        if wants_async(request):
+            return job_accepted(jobs.enqueue("timetable.generate", options, request.user), request)
+        result = timetable.generate(terms.get(), **{k: v for k, v in options.items() if k != "term"})
+        return Response(serializers.TimetableSerializer(result).data)
+
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsRegistrarLike])
+    def resolve(self, request, pk=None):
+        tt = self.get_object()
+        params = serializers.TimetableResolveSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        if wants_async(request):
+            return job_accepted(jobs.enqueue("timetable.resolve", {"timetable_id": tt.pk, **params.validated_data}, request.user), request)
+        return Response(serializers.TimetableSerializer(timetable.resolve(tt, **params.validated_data)).data)
+
+    @action(detail=True, methods=["get"])
+    def grid(self, request, pk=None):
+        tt = self.get_object()
+        params = serializers.TimetableGridSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        entries = tt.entries.select_related("assignment__subject", "teacher", "section__grade")
+        if "section" in params.validated_data:
+            entries = entries.filter(section_id=params.validated_data["section"])
+        else:
+            entries = entries.filter(teacher_id=params.validated_data["teacher"])
+        grid = [[None] * tt.periods_per_day for _ in range(tt.days)]
+        for e in entries:
+            if e.day < tt.days and e.period < tt.periods_per_day:
+                grid[e.day][e.period] = {
+                    "entry": e.pk, "assignment": e.assignment_id, "subject": e.assignment.subject.name,
+                    "teacher": str(e.teacher), "section": str(e.section),
+                }
+        return Response({"timetable": tt.pk, "days": tt.days, "periods_per_day": tt.periods_per_day, "grid": grid})
+
+class TimetableEntryViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = models.TimetableEntry.objects.all()
+    serializer_class = serializers.TimetableEntrySerializer
+    permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {
+        "timetable": "timetable_id",
+        "term": "timetable__term_id",
+        "teacher": "teacher_id",
+        "section": "section_id",
+        "day": "day",
+    }
+    ordering_fields = ["id", "day", "period"]
+
+    def get_queryset(self):
+        qs = models.TimetableEntry.objects.all()
+        if self.request.user.school_id:
+            qs = qs.filter(section__grade__school_id=self.request.user.school_id)
+        return qs
 
 class AttendanceSessionViewSet(viewsets.ModelViewSet):
     queryset = models.AttendanceSession.objects.all()
     serializer_class = serializers.AttendanceSessionSerializer
     permission_classes = [IsAuthenticated, TeacherCanModifyAssigned]
+    filter_params = {
+        "section": "section_id",
+        "term": "term_id",
+        "date": "session_date",
+        "date_from": "session_date__gte",
+        "date_to": "session_date__lte",
+    }
+    ordering_fields = ["id", "session_date"]
+
+    def get_queryset(self):
+        return filter_by_school(models.AttendanceSession.objects.all(), self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-class AttendanceRecordViewSet(viewsets.ModelViewSet):
-    queryset = models.AttendanceRecord.objects.all()
+    @action(detail=True, methods=["post"], url_path="records")
+    def submit_records(self, request, pk=None):
+        """Upsert the whole roster for this session: one permission check, one write."""
+        session = self.get_object()
+        roster = serializers.AttendanceRosterSerializer(data=request.data)
+        roster.is_valid(raise_exception=True)
+        entries = roster.validated_data["records"]
+
+        student_ids = [e["student"] for e in entries]
+        enrolled = set(models.Enrollment.objects.filter(
+            section_id=session.section_id,
+            academic_year__terms=session.term_id,
+            status=models.Enrollment.Status.ACTIVE,
+            student_id__in=student_ids,
+        ).values_list("student_id", flat=True))
+        not_enrolled = [sid for sid in student_ids if sid not in enrolled]
+        if not_enrolled:
+            raise ValidationError({"records": f"Students not enrolled in this section: {not_enrolled}"})
+
+        year_id = partitions.year_of_term(session.term_id)
+        with transaction.atomic():
+            models.AttendanceRecord.objects.bulk_create(
+                [
+                    models.AttendanceRecord(
+                        session=session, student_id=e["student"], status=e["status"], note=e.get("note"),
+                        academic_year_id=year_id, school_id=session.school_id,
+                    )
+                    for e in entries
+                ],
+                update_conflicts=True,
+                unique_fields=["session", "student", "academic_year"],
+                update_fields=["status", "note"],
+            )
+            sync.record_changes(models.AttendanceRecord.objects.filter(session=session, student_id__in=student_ids))
+        analytics.invalidate(session.term_id, session.section_id)
+        return Response({"session": session.id, "records": len(entries)}, status=status.HTTP_200_OK)
+
+class AttendanceRecordViewSet(ExportMixin, viewsets.ModelViewSet):
+    queryset = models.AttendanceRecord.objects.select_related("session")
     serializer_class = serializers.AttendanceRecordSerializer
     permission_classes = [IsAuthenticated, TeacherCanModifyAssigned]
+    pagination_class = LedgerPagination
+    filter_params = {
+        "session": "session_id",
+        "student": "student_id",
+        "status": "status__in",
+        "section": "session__section_id",
+        "date_from": "session__session_date__gte",
+        "date_to": "session__session_date__lte",
+        "academic_year": "academic_year_id",
+    }
+    export_fields = [
+        "id", "session_id", "session__session_date", "session__section_id",
+        "student_id", "student__admission_no", "status", "note",
+    ]
 
     def get_queryset(self):
         u=self.request.user
         if u.role == User.Role.STUDENT and hasattr(u, "student_profile") and u.student_profile:
             return models.AttendanceRecord.objects.filter(student=u.student_profile)
-        return models.AttendanceRecord.objects.all()
+        return filter_by_school(models.AttendanceRecord.objects.select_related("session"), u)
+
+class AttendanceAnalyticsViewSet(viewsets.ViewSet):
+    """Term attendance dashboards: `?term=<id>[&section=<id>]`, cached per (term, section)."""
+    permission_classes = [IsAuthenticated, IsStaffRole]
+
+    def _params(self, request):
+        params = serializers.AttendanceAnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        terms = models.Term.objects.filter(pk=data["term"])
+        if request.user.school_id:
+            terms = terms.filter(academic_year__school_id=request.user.school_id)
+        if not terms.exists():
+            raise ValidationError({"term": "Unknown term."})
+        return data
+
+    @action(detail=False, methods=["get"])
+    def students(self, request):
+        p = self._params(request)
+        return Response(analytics.student_rates(p["term"], p.get("section")))
+
+    @action(detail=False, methods=["get"])
+    def daily(self, request):
+        p = self._params(request)
+        return Response(analytics.daily_rates(p["term"], p.get("section")))
+
+    @action(detail=False, methods=["get"], url_path="chronic-absentees")
+    def chronic_absentees(self, request):
+        p = self._params(request)
+        return Response(analytics.chronic_absentees(p["term"], p.get("section"), p["threshold"]))
 
 class AssessmentViewSet(viewsets.ModelViewSet):
     queryset = models.Assessment.objects.all()
     serializer_class = serializers.AssessmentSerializer
     permission_classes = [IsAuthenticated, TeacherCanModifyAssigned]
+    filter_params = {"term": "term_id", "section": "section_id", "subject": "subject_id"}
 
-class AssessmentScoreViewSet(viewsets.ModelViewSet):
-    queryset = models.AssessmentScore.objects.all()
+    def perform_update(self, serializer):
+        before = serializer.instance.term_id, serializer.instance.section_id, serializer.instance.subject_id
+        a = serializer.save()
+        gradebook.refresh_results(a.term_id, a.section_id, a.subject_id)
+        if before != (a.term_id, a.section_id, a.subject_id):
+            gradebook.refresh_results(*before)
+
+    def perform_destroy(self, instance):
+        scope = instance.term_id, instance.section_id, instance.subject_id
+        instance.delete()
+        gradebook.refresh_results(*scope)
+
+class AssessmentScoreViewSet(ExportMixin, viewsets.ModelViewSet):
+    queryset = models.AssessmentScore.objects.select_related("assessment")
     serializer_class = serializers.AssessmentScoreSerializer
     permission_classes = [IsAuthenticated, TeacherCanModifyAssigned]
+    pagination_class = LedgerPagination
+    filter_params = {"assessment": "assessment_id", "student": "student_id", "academic_year": "academic_year_id"}
+    export_fields = [
+        "id", "assessment_id", "assessment__name", "assessment__subject__name", "assessment__max_score",
+        "student_id", "student__admission_no", "score", "graded_at",
+    ]
 
     def perform_create(self, serializer):
-        serializer.save(graded_by=self.request.user)
+        score = serializer.save(graded_by=self.request.user)
+        self._refresh_results(score.assessment)
 
     def perform_update(self, serializer):
-        serializer.save(graded_by=self.request.user)
+        previous = serializer.instance.assessment
+        score = serializer.save(graded_by=self.request.user)
+        self._refresh_results(score.assessment)
+        if previous.pk != score.assessment_id:
+            self._refresh_results(previous)
+
+    def perform_destroy(self, instance):
+        assessment = instance.assessment
+        instance.delete()
+        self._refresh_results(assessment)
+
+    def _refresh_results(self, assessment):
+        gradebook.refresh_results(assessment.term_id, assessment.section_id, assessment.subject_id)
 
     def get_queryset(self):
         u=self.request.user
         if u.role == User.Role.STUDENT and hasattr(u, "student_profile") and u.student_profile:
             return models.AssessmentScore.objects.filter(student=u.student_profile)
-        return models.AssessmentScore.objects.all()
+        return filter_by_school(models.AssessmentScore.objects.select_related("assessment"), u)
 
-class FeeHeadViewSet(viewsets.ModelViewSet):
+class FeeHeadViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     queryset = models.FeeHead.objects.all()
     serializer_class = serializers.FeeHeadSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    pagination_class = ReferencePagination
     def get_queryset(self):
         return filter_by_school(models.FeeHead.objects.all(), self.request.user)
 
@@ -153,40 +463,196 @@ class FeeStructureViewSet(viewsets.ModelViewSet):
     queryset = models.FeeStructure.objects.all()
     serializer_class = serializers.FeeStructureSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {"academic_year": "academic_year_id", "grade": "grade_id"}
+
+    @action(detail=True, methods=["post"], url_path="generate-invoices", permission_classes=[IsAuthenticated, IsFinanceLike])
+    def generate_invoices(self, request, pk=None):
+        """Invoice every active enrollment for this structure's grade and year."""
+        fs = self.get_object()
+        params = serializers.InvoiceGenerationSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        if wants_async(request):
+            payload = {k: v and v.isoformat() for k, v in params.validated_data.items()}
+            return job_accepted(jobs.enqueue("billing.generate_invoices", {"fee_structure": fs.pk, **payload}, request.user), request)
+        result = billing.generate_invoices(fs, **params.validated_data)
+        return Response(result, status=status.HTTP_200_OK)
 
 class FeeStructureItemViewSet(viewsets.ModelViewSet):
     queryset = models.FeeStructureItem.objects.all()
     serializer_class = serializers.FeeStructureItemSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {"fee_structure": "fee_structure_id"}
 
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = models.Invoice.objects.all()
     serializer_class = serializers.InvoiceSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {
+        "student": "student_id",
+        "status": "status__in",
+        "academic_year": "academic_year_id",
+        "fee_structure": "fee_structure_id",
+        "due_from": "due_on__gte",
+        "due_to": "due_on__lte",
+    }
+    ordering_fields = ["id", "issued_on"]
+    export_fields = [
+        "id", "student_id", "student__admission_no", "academic_year__name",
+        "issued_on", "due_on", "status", "total", "paid", "balance",
+    ]
 
     def get_queryset(self):
         u=self.request.user
         if u.role == User.Role.STUDENT and hasattr(u, "student_profile") and u.student_profile:
             return models.Invoice.objects.filter(student=u.student_profile)
-        return models.Invoice.objects.all()
+        return filter_by_school(models.Invoice.objects.all(), u)
 
 class InvoiceItemViewSet(viewsets.ModelViewSet):
     queryset = models.InvoiceItem.objects.all()
     serializer_class = serializers.InvoiceItemSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    pagination_class = LedgerPagination
+    filter_params = {"invoice": "invoice_id"}
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = models.Payment.objects.all()
     serializer_class = serializers.PaymentSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    filter_params = {
+        "student": "student_id",
+        "method": "method",
+        "paid_from": "paid_on__gte",
+        "paid_to": "paid_on__lte",
+    }
+    ordering_fields = ["id", "paid_on"]
+    export_fields = ["id", "student_id", "student__admission_no", "paid_on", "method", "reference", "amount"]
 
     def get_queryset(self):
         u=self.request.user
         if u.role == User.Role.STUDENT and hasattr(u, "student_profile") and u.student_profile:
             return models.Payment.objects.filter(student=u.student_profile)
-        return models.Payment.objects.all()
+        return filter_by_school(models.Payment.objects.all(), u)
+
+    def perform_create(self, serializer):
+        payment = serializer.save()
+        billing.allocate_payments([payment.pk])
+
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsFinanceLike])
+    def allocate(self, request, pk=None):
+        """Allocate whatever is left of this payment to the student's open invoices."""
+        payment = self.get_object()
+        return Response(serializers.AllocationSummarySerializer(billing.allocate_payments([payment.pk])).data)
+
+    @action(detail=False, methods=["post"], url_path="allocate-batch", permission_classes=[IsAuthenticated, IsFinanceLike])
+    def allocate_batch(self, request):
+        """Allocate every payment received on `paid_on` in one pass."""
+        params = serializers.PaymentBatchSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        ids = self.get_queryset().filter(paid_on=params.validated_data["paid_on"]).values_list("pk", flat=True)
+        return Response(serializers.AllocationSummarySerializer(billing.allocate_payments(list(ids))).data)
 
 class PaymentAllocationViewSet(viewsets.ModelViewSet):
     queryset = models.PaymentAllocation.objects.all()
     serializer_class = serializers.PaymentAllocationSerializer
     permission_classes = [IsAuthenticated, AdminRegistrarFinanceTeacherReadOnly]
+    pagination_class = LedgerPagination
+    filter_params = {"payment": "payment_id", "invoice": "invoice_id"}
+
+class TermResultViewSet(viewsets.ReadOnlyModelViewSet):
+    """Materialized term marks, ranks and percentiles; `?term=&section=&subject=&student=`, `?overall=1`."""
+    queryset = models.TermResult.objects.all()
+    serializer_class = serializers.TermResultSerializer
+    permission_classes = [IsAuthenticated]
+    filter_params = {
+        "term": "term_id",
+        "section": "section_id",
+        "subject": "subject_id",
+        "student": "student_id",
+        "overall": "subject__isnull",
+    }
+    ordering_fields = ["id", "rank"]
+
+    def get_queryset(self):
+        u=self.request.user
+        if u.role == User.Role.STUDENT:
+            student = getattr(u, "student_profile", None)
+            return models.TermResult.objects.filter(student=student) if student else models.TermResult.objects.none()
+        qs = models.TermResult.objects.all()
+        if u.role == User.Role.TEACHER:
+            teacher = getattr(u, "teacher_profile", None)
+            if not teacher:
+                return qs.none()
+            sections = {section for _, section, _ in teacher_scopes(teacher.id)}
+            qs = qs.filter(section_id__in=sections)
+        if u.school_id:
+            return qs.filter(section__grade__school_id=u.school_id)
+        return qs if u.is_superuser else qs.none()
+
+class ReportCardViewSet(viewsets.ViewSet):
+    """`GET /api/report-cards/?term=<id>&section=<id>|grade=<id>&as=html|pdf` -> zip of one card per student."""
+    permission_classes = [IsAuthenticated, IsStaffRole]
+
+    def list(self, request):
+        params = serializers.ReportCardQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        fmt = request.query_params.get("as", "html")
+        if fmt not in reportcards.FORMATS:
+            raise ValidationError({"as": f"Choose one of: {', '.join(reportcards.FORMATS)}"})
+        if fmt == "pdf" and not reportcards.pdf_available():
+            raise ValidationError({"as": "PDF rendering requires WeasyPrint on the server."})
+
+        school_id = request.user.school_id
+        term = models.Term.objects.filter(pk=data["term"])
+        sections = models.Section.objects.all()
+        if school_id:
+            term = term.filter(academic_year__school_id=school_id)
+            sections = sections.filter(grade__school_id=school_id)
+        term = term.first()
+        if term is None:
+            raise ValidationError({"term": "Unknown term."})
+        if "section" in data:
+            sections, scope = sections.filter(pk=data["section"]), f"section{data['section']}"
+        else:
+            sections, scope = sections.filter(grade_id=data["grade"]), f"grade{data['grade']}"
+        section_ids = list(sections.values_list("id", flat=True))
+        if not section_ids:
+            raise ValidationError({"section" if "section" in data else "grade": "Nothing to report on."})
+
+        archive = reportcards.build_zip(reportcards.collect(term, section_ids), fmt)
+        return FileResponse(
+            archive, as_attachment=True, filename=f"report-cards-term{term.id}-{scope}.zip", content_type="application/zip",
+        )
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Background job status and progress; staff see their own jobs, admins every job."""
+    queryset = models.Job.objects.all()
+    serializer_class = serializers.JobSerializer
+    permission_classes = [IsAuthenticated, IsStaffRole]
+    filter_params = {"status": "status__in", "name": "name"}
+
+    def get_queryset(self):
+        u=self.request.user
+        if u.is_superuser or u.role == User.Role.ADMIN:
+            return models.Job.objects.all()
+        return models.Job.objects.filter(created_by=u)
+
+class SyncViewSet(viewsets.ViewSet):
+    """Delta sync for offline clients.
+
+    `GET /api/sync/cursor/` returns the current cursor (take it before a full
+    download); `GET /api/sync/?since=<cursor>` returns rows changed since then,
+    scoped to the caller, plus tombstones for deleted rows.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        params = serializers.SyncQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(sync.changes_since(
+            request.user, params.validated_data["since"], params.validated_data["limit"], {"request": request},
+        ))
+
+    @action(detail=False, methods=["get"])
+    def cursor(self, request):
+        return Response({"cursor": sync.current_cursor()})
@@ -3,4 +3,10 @@ set -o errexit
 
 python manage.py migrate
 python manage.py collectstatic --noinput || true
-gunicorn app.wsgi:application --bind 0.0.0.0:8000
+# ASGI=1 serves app.asgi through uvicorn workers, so async views (the student
+# portal dashboard) don't hold a worker thread while they wait on the database.
+if [ "${ASGI:-0}" = "1" ]; then
+  gunicorn app.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
+else
+  gunicorn app.wsgi:application --bind 0.0.0.0:8000
+fi